@@ -1,12 +1,16 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response, stream_with_context
 from flask_cors import CORS
 from database import Database
-from email_service import init_mail, send_booking_confirmation
-from seat_recommender import SeatRecommender
+from email_service import init_mail, queue_booking_confirmation, queue_group_booking_confirmation, get_email_queue_stats
+from seat_recommender import SeatRecommender, RecommendationCache, InvalidCursorError
+from seat_features import SeatFeatureStore
 from nlp_processor import SeatAdvisorNLP
-from nlp_processor_azure import AzureNLPProcessor
+from nlp_processor_azure import get_nlp_processor
 from session_manager import SessionManager
+from metrics import registry as metrics_registry, render_gauges
 import os
+import json
+import time
 from dotenv import load_dotenv
 
 # Load environment variables from both .env and APIKEY.env
@@ -14,61 +18,83 @@ load_dotenv()
 load_dotenv('APIKEY.env')
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Inventory-Revision'])
 
 # Initialize database
 db = Database()
 
+# Shared recommender features, rebuilt per inventory version and updated
+# incrementally as seats are booked or cancelled
+seat_features = SeatFeatureStore(
+    db,
+    ttl_seconds=float(os.getenv('FEATURE_STORE_TTL', 0)),
+    score_memo_entries=int(os.getenv('RECOMMENDER_SCORE_MEMO_ENTRIES', 64))
+)
+
+# Recommendation results for repeated preferences, revalidated on every
+# booking or cancellation through the feature store
+recommendation_cache = RecommendationCache(
+    max_entries=int(os.getenv('RECOMMENDATION_CACHE_MAX_ENTRIES', 512)),
+    max_bytes=int(os.getenv('RECOMMENDATION_CACHE_MAX_BYTES', 2 * 1024 * 1024))
+)
+seat_features.add_listener(recommendation_cache.on_snapshot)
+
 # Initialize email service
 init_mail(app)
 
-# Initialize session manager
-session_manager = SessionManager(timeout_minutes=30)
-
-def calculate_seat_id(seat, all_seats):
-    """Calculate the seat ID (F1, M1, B1, etc.) based on seat type and position"""
-    seat_type = seat.get('seat_type', 'regular')
-
-    if seat_type == 'regular_top':
-        # F-series: continuous numbering for top regular seats
-        # Get all top regular seats ordered by layer, then side (left before right), then position
-        top_seats = [s for s in all_seats if s.get('seat_type') == 'regular_top']
-        top_seats.sort(key=lambda s: (s['layer'], s['side'], s['position']))
-
-        # Find the index of current seat
-        for idx, s in enumerate(top_seats):
-            if s['id'] == seat['id']:
-                return f"F{idx + 1}"
-
-    elif seat_type == 'perpendicular_front':
-        # M-series: continuous numbering for perpendicular front seats
-        perp_seats = [s for s in all_seats if s.get('seat_type') == 'perpendicular_front']
-        perp_seats.sort(key=lambda s: (s['layer'], s['position']))
-
-        # Find the index of current seat
-        for idx, s in enumerate(perp_seats):
-            if s['id'] == seat['id']:
-                return f"M{idx + 1}"
+# Maximum number of seats in one group booking
+MAX_GROUP_BOOKING_SEATS = 20
 
-    elif seat_type == 'regular_bottom':
-        # B-series: continuous numbering for bottom regular seats
-        bottom_seats = [s for s in all_seats if s.get('seat_type') == 'regular_bottom']
-        bottom_seats.sort(key=lambda s: (s['layer'], s['side'], s['position']))
+# Seconds a chat request may spend waiting on Azure before the keyword fallback answers
+CHAT_REQUEST_DEADLINE = float(os.getenv('CHAT_REQUEST_DEADLINE', 10))
 
-        # Find the index of current seat
-        for idx, s in enumerate(bottom_seats):
-            if s['id'] == seat['id']:
-                return f"B{idx + 1}"
+# Initialize session manager
+session_manager = SessionManager(timeout_minutes=30)
 
-    # Fallback
-    return f"SEAT-{seat['id']}"
+# Initialize shared NLP processor (Azure OpenAI with keyword fallback)
+nlp_processor = get_nlp_processor()
+
+def booking_seat_info(booking):
+    """Build the email seat_info dict from a booking record"""
+    seat = booking['seat']
+    return {
+        'seat_id': booking['seat_code'] or f"SEAT-{booking['seat_id']}",
+        'layer': seat['layer'],
+        'side': seat.get('side'),
+        'position': seat['position'],
+        'price': seat['price'],
+        'seat_type': seat.get('seat_type', 'regular')
+    }
 
 @app.route('/api/seats', methods=['GET'])
 def get_seats():
     """Get all seats with their availability status"""
     try:
-        seats = db.get_all_seats()
-        return jsonify(seats), 200
+        revision, seats = db.get_all_seats_with_revision()
+        return jsonify(seats), 200, {'X-Inventory-Revision': str(revision)}
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/seats/changes', methods=['GET'])
+def get_seat_changes():
+    """Get seats whose availability changed since a given inventory revision"""
+    try:
+        since = request.args.get('since', type=int)
+        if since is None:
+            return jsonify({'error': 'Missing or invalid query parameter: since'}), 400
+
+        return jsonify(db.get_seat_changes(since)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/seats/by-code/<seat_code>', methods=['GET'])
+def get_seat_by_code(seat_code):
+    """Get specific seat details by seat code (e.g. F12, M3, B40)"""
+    try:
+        seat = db.get_seat_by_code(seat_code)
+        if seat:
+            return jsonify(seat), 200
+        return jsonify({'error': 'Seat not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -96,64 +122,103 @@ def create_booking():
                 return jsonify({'error': f'Missing required field: {field}'}), 400
 
         # Create booking
-        booking_id = db.create_booking(
+        booking = db.create_booking(
             data['seat_id'],
             data['user_name'],
             data['user_email']
         )
 
-        if booking_id:
-            # Get seat details for email
-            seat = db.get_seat_by_id(data['seat_id'])
-
-            # Get booking details
-            bookings = db.get_all_bookings()
-            current_booking = next((b for b in bookings if b['id'] == booking_id), None)
-
-            if seat and current_booking:
-                # Get all seats for seat_id calculation
-                all_seats = db.get_all_seats()
-                seat_id = calculate_seat_id(seat, all_seats)
-
-                # Prepare email data
-                from datetime import datetime
-                booking_data = {
-                    'booking_id': booking_id,
-                    'user_name': data['user_name'],
-                    'user_email': data['user_email'],
-                    'booking_date': current_booking.get('booking_date', datetime.now().isoformat()),
-                    'seat_info': {
-                        'seat_id': seat_id,
-                        'layer': seat['layer'],
-                        'side': seat.get('side'),
-                        'position': seat['position'],
-                        'price': seat['price'],
-                        'seat_type': seat.get('seat_type', 'regular')
-                    }
-                }
-
-                # Send confirmation email (non-blocking - won't fail booking if email fails)
-                email_sent, email_message = send_booking_confirmation(booking_data)
-
-                if not email_sent:
-                    # Log warning but don't fail the booking
-                    print(f"Warning: {email_message}")
-
-                return jsonify({
-                    'message': 'Booking created successfully',
-                    'booking_id': booking_id,
-                    'email_sent': email_sent,
-                    'email_message': email_message if not email_sent else 'Confirmation email sent successfully'
-                }), 201
+        if not booking:
+            return jsonify({'error': 'Seat is already booked'}), 400
+
+        # Prepare email data from the booking record
+        booking_data = {
+            'booking_id': booking['id'],
+            'user_name': booking['user_name'],
+            'user_email': booking['user_email'],
+            'booking_date': booking['booking_date'],
+            'seat_info': booking_seat_info(booking)
+        }
+
+        # Queue confirmation email (background delivery - won't fail or delay the booking)
+        email_status, email_message = queue_booking_confirmation(booking_data)
+
+        if email_status != 'queued':
+            # Log warning but don't fail the booking
+            print(f"Warning: {email_message}")
+
+        return jsonify({
+            'message': 'Booking created successfully',
+            'booking_id': booking['id'],
+            'booking': booking,
+            'email_status': email_status,
+            'email_message': email_message
+        }), 201
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
+@app.route('/api/bookings/batch', methods=['POST'])
+def create_group_booking():
+    """Book several seats all-or-nothing and send one confirmation email"""
+    try:
+        data = request.get_json()
+
+        # Validate required fields
+        required_fields = ['seat_ids', 'user_name', 'user_email']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({'error': f'Missing required field: {field}'}), 400
+
+        seat_ids = data['seat_ids']
+        if not isinstance(seat_ids, list) or not seat_ids:
+            return jsonify({'error': 'seat_ids must be a non-empty list'}), 400
+        if not all(isinstance(seat_id, int) for seat_id in seat_ids):
+            return jsonify({'error': 'seat_ids must contain integer seat IDs'}), 400
+
+        seat_ids = list(dict.fromkeys(seat_ids))
+        if len(seat_ids) > MAX_GROUP_BOOKING_SEATS:
+            return jsonify({'error': f'Cannot book more than {MAX_GROUP_BOOKING_SEATS} seats at once'}), 400
+
+        # Book all seats in a single transaction
+        bookings = db.create_group_booking(seat_ids, data['user_name'], data['user_email'])
+
+        if not bookings:
+            unavailable = [
+                seat_id for seat_id in seat_ids
+                if not (db.get_seat_by_id(seat_id) or {}).get('is_available')
+            ]
             return jsonify({
-                'message': 'Booking created successfully',
-                'booking_id': booking_id,
-                'email_sent': False,
-                'email_message': 'Could not retrieve seat information for email'
-            }), 201
-        else:
-            return jsonify({'error': 'Seat is already booked'}), 400
+                'error': 'One or more seats are already booked',
+                'unavailable_seat_ids': unavailable
+            }), 400
+
+        # Build one combined email from the booking records
+        booked_seats = [
+            {'booking_id': booking['id'], **booking_seat_info(booking)}
+            for booking in bookings
+        ]
+
+        booking_data = {
+            'user_name': data['user_name'],
+            'user_email': data['user_email'],
+            'booking_date': bookings[0]['booking_date'],
+            'seats': booked_seats
+        }
+
+        # Queue confirmation email (background delivery - won't fail or delay the booking)
+        email_status, email_message = queue_group_booking_confirmation(booking_data)
+
+        if email_status != 'queued':
+            print(f"Warning: {email_message}")
+
+        return jsonify({
+            'message': 'Group booking created successfully',
+            'booking_ids': [booking['id'] for booking in bookings],
+            'bookings': bookings,
+            'email_status': email_status,
+            'email_message': email_message
+        }), 201
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -178,6 +243,59 @@ def cancel_booking(booking_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/db/pool-stats', methods=['GET'])
+def get_db_pool_stats():
+    """Get database connection pool statistics"""
+    try:
+        return jsonify(db.get_pool_stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/db/cache-stats', methods=['GET'])
+def get_db_cache_stats():
+    """Get seat inventory cache statistics"""
+    try:
+        return jsonify(db.get_cache_stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/email/queue-stats', methods=['GET'])
+def get_email_stats():
+    """Get confirmation email queue metrics"""
+    try:
+        return jsonify(get_email_queue_stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Get LLM call metrics together with the pool, cache, email and chat stats
+
+    Returns JSON by default, or the Prometheus text format with ?format=prometheus.
+    """
+    try:
+        stats = {
+            'db_pool': db.get_pool_stats(),
+            'seat_cache': db.get_cache_stats(),
+            'seat_features': seat_features.get_stats(),
+            'recommendation_cache': recommendation_cache.get_stats(),
+            'email_queue': get_email_queue_stats()
+        }
+
+        if request.args.get('format') == 'prometheus':
+            body = metrics_registry.to_prometheus() + ''.join(
+                render_gauges(name, values) for name, values in stats.items()
+            )
+            return Response(body, mimetype='text/plain; version=0.0.4')
+
+        return jsonify({
+            'llm': metrics_registry.snapshot(),
+            'chat': nlp_processor.get_status(),
+            **stats
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/log-3d-error', methods=['POST'])
 def log_3d_error():
     """Log 3D view errors to file"""
@@ -213,11 +331,8 @@ def get_seat_recommendations():
         data = request.get_json()
         print(f"Received recommendation request: {data}")
 
-        # Get all seats
-        seats = db.get_all_seats()
-
-        # Initialize recommender
-        recommender = SeatRecommender(seats)
+        # Initialize recommender over the shared feature snapshot and cache
+        recommender = SeatRecommender.from_snapshot(seat_features.get_snapshot(), cache=recommendation_cache)
 
         # Extract preferences from request
         preferences = {
@@ -232,12 +347,17 @@ def get_seat_recommendations():
 
         # Get number of recommendations to return (default 5)
         limit = data.get('limit', 5)
+        if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+            return jsonify({'error': 'limit must be a positive integer'}), 400
 
-        # Get recommendations
-        result = recommender.get_recommendations(preferences, limit)
+        # Get recommendations; pass back next_cursor to get the following page
+        result = recommender.get_recommendations(preferences, limit, cursor=data.get('cursor'))
 
         return jsonify(result), 200
 
+    except InvalidCursorError as e:
+        return jsonify({'error': str(e)}), 400
+
     except Exception as e:
         import traceback
         import sys
@@ -246,17 +366,54 @@ def get_seat_recommendations():
         print(error_details, file=sys.stderr, flush=True)
         return jsonify({'error': str(e), 'details': error_details}), 500
 
+@app.route('/api/seat-recommendations/groups', methods=['POST'])
+def get_group_recommendations():
+    """Get the best groups of adjacent seats for a party booking together"""
+    try:
+        data = request.get_json()
+
+        group_size = data.get('group_size')
+        if not isinstance(group_size, int) or isinstance(group_size, bool) \
+                or not 1 <= group_size <= MAX_GROUP_BOOKING_SEATS:
+            return jsonify({'error': f'group_size must be an integer from 1 to {MAX_GROUP_BOOKING_SEATS}'}), 400
+
+        limit = data.get('limit', 3)
+        if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+
+        recommender = SeatRecommender.from_snapshot(seat_features.get_snapshot())
+
+        preferences = {
+            'budget_max': data.get('budget_max'),
+            'budget_min': data.get('budget_min', 0),
+            'ac_importance': data.get('ac_importance', 'optional'),
+            'view_importance': data.get('view_importance', 5),
+            'famous_people': data.get('famous_people', False),
+            'position_preference': data.get('position_preference'),
+            'location_preference': data.get('location_preference')
+        }
+
+        # Book a returned group with POST /api/bookings/batch and its seat_ids
+        result = recommender.get_group_recommendations(preferences, group_size, limit)
+
+        return jsonify(result), 200
+
+    except Exception as e:
+        import traceback
+        import sys
+        error_details = traceback.format_exc()
+        print(f"Error in group recommendations: {str(e)}", file=sys.stderr, flush=True)
+        print(error_details, file=sys.stderr, flush=True)
+        return jsonify({'error': str(e), 'details': error_details}), 500
+
 @app.route('/api/seat-recommendations/quick-filter', methods=['POST'])
 def quick_filter_seats():
     """Quick filter seats by simple criteria"""
     try:
         data = request.get_json()
 
-        # Get all seats
-        seats = db.get_all_seats()
-
-        # Initialize recommender
-        recommender = SeatRecommender(seats)
+        # Initialize recommender over the shared feature snapshot
+        recommender = SeatRecommender.from_snapshot(seat_features.get_snapshot())
 
         # Extract filters
         filters = {
@@ -265,7 +422,8 @@ def quick_filter_seats():
             'has_ac': data.get('has_ac'),
             'view_min': data.get('view_min'),
             'has_famous': data.get('has_famous'),
-            'seat_type': data.get('seat_type')
+            'seat_type': data.get('seat_type'),
+            'price_tier': data.get('price_tier')  # 'budget', 'standard', 'premium'
         }
 
         # Remove None values
@@ -283,6 +441,17 @@ def quick_filter_seats():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/seat-recommendations/stats', methods=['GET'])
+def get_recommendation_stats():
+    """Get recommender feature store and result cache statistics"""
+    try:
+        return jsonify({
+            'feature_store': seat_features.get_stats(),
+            'cache': recommendation_cache.get_stats()
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/chat', methods=['POST'])
 def handle_chat():
     """Process natural language chat messages with Azure OpenAI"""
@@ -294,20 +463,27 @@ def handle_chat():
         if not user_message:
             return jsonify({'error': 'Message is required'}), 400
 
+        deadline = time.monotonic() + CHAT_REQUEST_DEADLINE
+
         # Get or create session
         if not session_id or not session_manager.get_session(session_id):
             session_id = session_manager.create_session()
 
         session = session_manager.get_session(session_id)
 
-        # Initialize Azure NLP processor (with fallback)
-        nlp = AzureNLPProcessor()
+        # A late Azure answer (hedged mode) refines preferences if the user hasn't moved on
+        turn = session_manager.get_turn_count(session_id) + 1
+        def apply_late_result(late_result):
+            session_manager.merge_preferences(session_id, late_result['preferences'], turn=turn)
 
         # Process message with conversation history
-        result = nlp.process_message(
+        result = nlp_processor.process_message(
             message=user_message,
             conversation_history=session['conversation_history'],
-            current_preferences=session['preferences']
+            current_preferences=session['preferences'],
+            use_cache=not data.get('bypass_cache', False),
+            on_late_result=apply_late_result,
+            deadline=deadline
         )
 
         # Update session with new message and preferences
@@ -336,5 +512,95 @@ def handle_chat():
             'response': "Sorry, I'm having trouble right now. Please try again."
         }), 500
 
+def sse_event(event, payload):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+@app.route('/api/chat/stream', methods=['POST'])
+def handle_chat_stream():
+    """Process a chat message, streaming the reply as Server-Sent Events
+
+    Events: `session` (session_id), `delta` (bot_message text as it is
+    generated), then `done` with the same fields as POST /api/chat, or `error`.
+    """
+    try:
+        data = request.get_json()
+        user_message = data.get('message', '').strip()
+        session_id = data.get('session_id')
+
+        if not user_message:
+            return jsonify({'error': 'Message is required'}), 400
+
+        # Get or create session
+        if not session_id or not session_manager.get_session(session_id):
+            session_id = session_manager.create_session()
+
+        session = session_manager.get_session(session_id)
+        conversation_history = list(session['conversation_history'])
+        current_preferences = dict(session['preferences'])
+        use_cache = not data.get('bypass_cache', False)
+        deadline = time.monotonic() + CHAT_REQUEST_DEADLINE
+
+        # A late Azure answer (hedged mode) refines preferences if the user hasn't moved on
+        turn = session_manager.get_turn_count(session_id) + 1
+        def apply_late_result(late_result):
+            session_manager.merge_preferences(session_id, late_result['preferences'], turn=turn)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    def generate():
+        yield sse_event('session', {'session_id': session_id})
+        try:
+            result = None
+            for event in nlp_processor.stream_message(
+                message=user_message,
+                conversation_history=conversation_history,
+                current_preferences=current_preferences,
+                use_cache=use_cache,
+                on_late_result=apply_late_result,
+                deadline=deadline
+            ):
+                if event['type'] == 'delta':
+                    yield sse_event('delta', {'text': event['text']})
+                else:
+                    result = event['result']
+
+            # Update session with new message and preferences
+            session_manager.update_session(
+                session_id=session_id,
+                user_message=user_message,
+                bot_response=result['bot_message'],
+                preferences=result['preferences']
+            )
+
+            yield sse_event('done', {
+                'session_id': session_id,
+                'response': result['bot_message'],
+                'preferences': session_manager.get_preferences(session_id),
+                'confidence': result.get('confidence', 0.8),
+                'ready_for_recommendations': result['ready_for_recommendations']
+            })
+
+        except Exception as e:
+            print(f"Chat stream error: {str(e)}")  # Log for debugging
+            yield sse_event('error', {
+                'error': 'Failed to process message',
+                'response': "Sorry, I'm having trouble right now. Please try again."
+            })
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/chat/status', methods=['GET'])
+def get_chat_status():
+    """Get NLP processor status (Azure availability and circuit breaker)"""
+    try:
+        return jsonify(nlp_processor.get_status()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
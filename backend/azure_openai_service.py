@@ -3,28 +3,318 @@ Azure OpenAI Service for Seat Advisor Chat
 Provides natural language understanding using GPT-4o-mini
 """
 
-from openai import AzureOpenAI
+from openai import AzureOpenAI, AsyncAzureOpenAI, APIConnectionError, RateLimitError, InternalServerError
 import os
+import re
+import random
+import copy
 import json
-from typing import List, Dict, Optional
+import asyncio
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import List, Dict, Optional, Iterator, Tuple
 from dotenv import load_dotenv
+from prompt_builder import PromptBuilder, TokenUsageTracker
+from metrics import registry as metrics, TOKEN_BUCKETS
 
 # Load environment variables from APIKEY.env
 load_dotenv('APIKEY.env')
 
 
+class ResponseCache:
+    """LRU + TTL cache of chat results keyed on message, preferences and history"""
+
+    # Number of trailing history messages folded into the key
+    HISTORY_FINGERPRINT_MESSAGES = 4
+
+    def __init__(self, max_entries=1000, ttl_seconds=300, max_bytes=5 * 1024 * 1024):
+        """
+        Initialize response cache
+
+        Args:
+            max_entries: Maximum number of cached responses
+            ttl_seconds: Seconds a response stays valid; 0 disables the cache
+            max_bytes: Approximate memory cap for cached responses
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'bypassed': 0, 'evictions': 0, 'expirations': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    @staticmethod
+    def normalize_message(message: str) -> str:
+        """Lowercase, collapse whitespace and drop trailing punctuation"""
+        return re.sub(r'\s+', ' ', message.lower()).strip().rstrip('.!?')
+
+    def make_key(self, user_message: str, conversation_history: List[Dict], current_preferences: Dict) -> str:
+        """Build a cache key from the normalized message, preferences and recent history"""
+        history = [
+            (m.get('role'), self.normalize_message(m.get('content', '')))
+            for m in conversation_history[-self.HISTORY_FINGERPRINT_MESSAGES:]
+        ]
+        material = json.dumps(
+            [self.normalize_message(user_message), current_preferences, history],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def count_bypass(self):
+        with self._lock:
+            self._stats['bypassed'] += 1
+
+    def get(self, key: str, count_miss: bool = True) -> Optional[Dict]:
+        """Get a copy of a cached response, or None
+
+        count_miss=False leaves a miss to be counted by the lookup that follows it.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if count_miss:
+                    self._stats['misses'] += 1
+                return None
+
+            stored_at, size, result = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                self._remove(key)
+                self._stats['expirations'] += 1
+                if count_miss:
+                    self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            metrics.inc('llm_cache_hits_total')
+            return copy.deepcopy(result)
+
+    def put(self, key: str, result: Dict):
+        """Store a response, evicting least recently used entries over the caps"""
+        size = len(key) + len(json.dumps(result, default=str))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic(), size, copy.deepcopy(result))
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict:
+        """Get hit-rate and memory statistics"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'hit_rate': round(self._stats['hits'] / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds
+            }
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request's deadline leaves no time for another Azure attempt"""
+
+
+class RetryPolicy:
+    """Per-attempt timeouts and jittered retries bounded by a request deadline"""
+
+    # APITimeoutError is a subclass of APIConnectionError
+    RETRYABLE_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+
+    def __init__(self, max_attempts=3, backoff_base=0.2, backoff_max=2.0, min_attempt_seconds=0.5, default_timeout=30.0):
+        """
+        Initialize retry policy
+
+        Args:
+            max_attempts: Maximum Azure attempts per call, including the first
+            backoff_base: Backoff ceiling in seconds before the first retry, doubling per retry
+            backoff_max: Upper limit for the backoff ceiling
+            min_attempt_seconds: Don't start an attempt with less time than this left
+            default_timeout: Per-attempt timeout when the caller has no deadline
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.min_attempt_seconds = min_attempt_seconds
+        self.default_timeout = default_timeout
+
+    def attempt_timeout(self, deadline: Optional[float]) -> float:
+        """
+        Get the timeout for the next attempt
+
+        Args:
+            deadline: time.monotonic() value by which the call must finish, or None
+
+        Returns:
+            Seconds the attempt may take
+
+        Raises:
+            DeadlineExceeded: If too little time is left for another attempt
+        """
+        if deadline is None:
+            return self.default_timeout
+        remaining = deadline - time.monotonic()
+        if remaining < self.min_attempt_seconds:
+            raise DeadlineExceeded(f"{max(remaining, 0.0):.2f}s left of the request deadline")
+        return min(remaining, self.default_timeout)
+
+    def retry_delay(self, attempt: int, error: Exception, deadline: Optional[float]) -> Optional[float]:
+        """
+        Get the backoff before retrying a failed attempt
+
+        Args:
+            attempt: Number of attempts made so far
+            error: Exception raised by the last attempt
+            deadline: time.monotonic() value by which the call must finish, or None
+
+        Returns:
+            Seconds to sleep before the next attempt, or None to give up
+        """
+        if attempt >= self.max_attempts or not isinstance(error, self.RETRYABLE_ERRORS):
+            return None
+
+        # Full jitter keeps retries from many requests from synchronizing
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+        if deadline is not None and deadline - time.monotonic() - delay < self.min_attempt_seconds:
+            return None
+        return delay
+
+
+class BotMessageStreamParser:
+    """Incrementally extracts the bot_message string from a streamed JSON object"""
+
+    KEY_PATTERN = re.compile(r'"bot_message"\s*:\s*"')
+    ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+    def __init__(self):
+        self._buffer = ''
+        self._pos = 0
+        self._state = 'seeking'
+
+    def feed(self, chunk: str) -> str:
+        """
+        Add streamed content and return newly decoded bot_message text
+
+        Args:
+            chunk: Next piece of the model's JSON output
+
+        Returns:
+            Decoded text of bot_message that became available with this chunk
+        """
+        self._buffer += chunk
+
+        if self._state == 'seeking':
+            match = self.KEY_PATTERN.search(self._buffer)
+            if not match:
+                return ''
+            self._pos = match.end()
+            self._state = 'in_string'
+
+        if self._state != 'in_string':
+            return ''
+
+        buf = self._buffer
+        i = self._pos
+        out = []
+        while i < len(buf):
+            ch = buf[i]
+            if ch == '"':
+                self._state = 'done'
+                i += 1
+                break
+            if ch != '\\':
+                out.append(ch)
+                i += 1
+                continue
+
+            # Escape sequence; wait for more input if it is split across chunks
+            if i + 1 >= len(buf):
+                break
+            esc = buf[i + 1]
+            if esc != 'u':
+                out.append(self.ESCAPES.get(esc, esc))
+                i += 2
+                continue
+            if i + 6 > len(buf):
+                break
+            code = int(buf[i + 2:i + 6], 16)
+            if 0xD800 <= code < 0xDC00:
+                # High surrogate; combine with the following low surrogate
+                if i + 12 > len(buf):
+                    break
+                if buf[i + 6:i + 8] == '\\u':
+                    low = int(buf[i + 8:i + 12], 16)
+                    out.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                    i += 12
+                    continue
+            out.append(chr(code))
+            i += 6
+
+        self._pos = i
+        return ''.join(out)
+
+
 class AzureOpenAIService:
     """Service for Azure OpenAI chat completions"""
 
     def __init__(self):
         """Initialize Azure OpenAI client"""
+        self.retry_policy = RetryPolicy(
+            max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", 3)),
+            backoff_base=float(os.getenv("LLM_RETRY_BACKOFF", 0.2)),
+            min_attempt_seconds=float(os.getenv("LLM_MIN_ATTEMPT_SECONDS", 0.5)),
+            default_timeout=float(os.getenv("AZURE_OPENAI_TIMEOUT", 30))
+        )
+        # Retries are driven by retry_policy, not the SDK
         self.client = AzureOpenAI(
             api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview"),
             azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
             api_key=os.getenv("AZURE_OPENAI_KEY"),
+            timeout=self.retry_policy.default_timeout,
+            max_retries=0
         )
         self.deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini")
         self.system_prompt = self._build_system_prompt()
+        self.prompt_builder = PromptBuilder(
+            self.system_prompt,
+            variant=os.getenv("AZURE_PROMPT_VARIANT", "full"),
+            token_budget=int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", 3000)),
+            max_history_messages=int(os.getenv("LLM_HISTORY_MESSAGES", 10))
+        )
+        self.token_usage = TokenUsageTracker()
+        self.response_cache = ResponseCache(
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1000)),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL", 300)),
+            max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", 5 * 1024 * 1024))
+        )
 
     def _build_system_prompt(self) -> str:
         """Build the system prompt for the seat advisor"""
@@ -126,69 +416,263 @@ Response:
   "confidence": 0.9
 }"""
 
-    def chat(
+    def get_cached(
         self,
         user_message: str,
         conversation_history: List[Dict],
         current_preferences: Dict
+    ) -> Optional[Dict]:
+        """
+        Look up a cached reply without calling Azure
+
+        Args:
+            user_message: User's input message
+            conversation_history: Previous messages [{"role": "user|assistant", "content": "..."}]
+            current_preferences: Current extracted preferences
+
+        Returns:
+            The cached result marked "cached", or None
+        """
+        if not self.response_cache.enabled:
+            return None
+        key = self.response_cache.make_key(user_message, conversation_history, current_preferences)
+        cached = self.response_cache.get(key, count_miss=False)
+        if cached is not None:
+            cached["cached"] = True
+        return cached
+
+    def chat(
+        self,
+        user_message: str,
+        conversation_history: List[Dict],
+        current_preferences: Dict,
+        use_cache: bool = True,
+        deadline: Optional[float] = None
     ) -> Dict:
         """
         Send message to Azure OpenAI and get structured response
 
+        Near-identical turns are answered from the response cache.
+
         Args:
             user_message: User's input message
             conversation_history: Previous messages [{"role": "user|assistant", "content": "..."}]
             current_preferences: Current extracted preferences
+            use_cache: Set False to bypass the response cache for this request
+            deadline: time.monotonic() value by which the call must finish, or None
 
         Returns:
             Dict with bot_message, preferences, ready_for_recommendations, confidence
         """
-        try:
-            # Build messages for API
-            messages = [{"role": "system", "content": self.system_prompt}]
+        cache_key = None
+        if self.response_cache.enabled:
+            if use_cache:
+                cache_key = self.response_cache.make_key(user_message, conversation_history, current_preferences)
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    cached["cached"] = True
+                    return cached
+            else:
+                self.response_cache.count_bypass()
+
+        result = self._chat_uncached(user_message, conversation_history, current_preferences, deadline)
 
-            # Add conversation history (limit to last 10 messages for context window)
-            messages.extend(conversation_history[-10:])
+        # Never cache error responses
+        if cache_key is not None and not result.get("error", False):
+            self.response_cache.put(cache_key, result)
 
-            # Add current user message with context
-            context_info = f"\n\n[Current user preferences: {json.dumps(current_preferences)}]"
-            messages.append({
-                "role": "user",
-                "content": user_message + context_info
-            })
+        return result
+
+    def _chat_uncached(
+        self,
+        user_message: str,
+        conversation_history: List[Dict],
+        current_preferences: Dict,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """Call Azure OpenAI without consulting the response cache"""
+        content = None
+        started = time.monotonic()
+        try:
+            messages, usage = self._build_messages(user_message, conversation_history, current_preferences)
 
             # Call Azure OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.deployment,
+            response = self._create_with_retries(
+                deadline,
                 messages=messages,
                 temperature=0.7,
                 max_tokens=500,
                 response_format={"type": "json_object"}  # Force JSON output
             )
 
+            self._record_usage(usage, response)
+
             # Parse JSON response
             content = response.choices[0].message.content
-            result = json.loads(content)
-
-            # Validate response structure
-            if not all(key in result for key in ["bot_message", "preferences", "ready_for_recommendations"]):
-                raise ValueError("Invalid response structure from Azure OpenAI")
-
-            return {
-                "bot_message": result.get("bot_message", ""),
-                "preferences": result.get("preferences", {}),
-                "ready_for_recommendations": result.get("ready_for_recommendations", False),
-                "confidence": result.get("confidence", 0.8)
-            }
+            result = self._parse_result(content)
+            self._observe_call("sync", started, "ok")
+            return result
 
         except json.JSONDecodeError as e:
             print(f"JSON decode error: {str(e)}, Content: {content}")
+            self._observe_call("sync", started, "json_error")
             return self._error_response("I had trouble understanding that. Could you rephrase?")
 
         except Exception as e:
             print(f"Azure OpenAI error: {str(e)}")
+            self._observe_call("sync", started, "deadline" if isinstance(e, DeadlineExceeded) else "error")
             return self._error_response("Sorry, I'm having technical difficulties. Please try again.")
 
+    def chat_stream(
+        self,
+        user_message: str,
+        conversation_history: List[Dict],
+        current_preferences: Dict,
+        use_cache: bool = True,
+        deadline: Optional[float] = None
+    ) -> Iterator[Dict]:
+        """
+        Stream a chat response from Azure OpenAI
+
+        Yields {"type": "delta", "text": ...} events as bot_message tokens arrive,
+        then one {"type": "result", "result": {...}} event with the parsed response.
+
+        Args:
+            user_message: User's input message
+            conversation_history: Previous messages [{"role": "user|assistant", "content": "..."}]
+            current_preferences: Current extracted preferences
+            use_cache: Set False to bypass the response cache for this request
+            deadline: time.monotonic() value by which the call must finish, or None
+        """
+        cache_key = None
+        if self.response_cache.enabled:
+            if use_cache:
+                cache_key = self.response_cache.make_key(user_message, conversation_history, current_preferences)
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    cached["cached"] = True
+                    yield {"type": "delta", "text": cached["bot_message"]}
+                    yield {"type": "result", "result": cached}
+                    return
+            else:
+                self.response_cache.count_bypass()
+
+        content = ""
+        started = time.monotonic()
+        try:
+            messages, usage = self._build_messages(user_message, conversation_history, current_preferences)
+
+            # Retries cover opening the stream; a stream that fails midway is not replayed
+            stream = self._create_with_retries(
+                deadline,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=500,
+                response_format={"type": "json_object"},
+                stream=True
+            )
+
+            parser = BotMessageStreamParser()
+            # Closing this generator early also closes the HTTP response
+            with stream:
+                for chunk in stream:
+                    # Azure sends content filter results in chunks without choices
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    if not content:
+                        metrics.observe("llm_time_to_first_token_seconds", time.monotonic() - started)
+                    content += delta
+                    text = parser.feed(delta)
+                    if text:
+                        yield {"type": "delta", "text": text}
+
+            # Streamed responses carry no usage block; estimate the completion
+            usage["completion_tokens"] = self.prompt_builder.counter.count(content)
+            self._record_usage(usage)
+
+            result = self._parse_result(content)
+            self._observe_call("stream", started, "ok")
+
+        except json.JSONDecodeError as e:
+            print(f"JSON decode error: {str(e)}, Content: {content}")
+            self._observe_call("stream", started, "json_error")
+            result = self._error_response("I had trouble understanding that. Could you rephrase?")
+
+        except Exception as e:
+            print(f"Azure OpenAI error: {str(e)}")
+            self._observe_call("stream", started, "deadline" if isinstance(e, DeadlineExceeded) else "error")
+            result = self._error_response("Sorry, I'm having technical difficulties. Please try again.")
+
+        # Never cache error responses
+        if cache_key is not None and not result.get("error", False):
+            self.response_cache.put(cache_key, result)
+
+        yield {"type": "result", "result": result}
+
+    def _create_with_retries(self, deadline: Optional[float], **request):
+        """Create a chat completion, retrying transient errors while the deadline allows"""
+        attempt = 0
+        while True:
+            timeout = self.retry_policy.attempt_timeout(deadline)
+            attempt += 1
+            try:
+                return self.client.with_options(timeout=timeout).chat.completions.create(
+                    model=self.deployment, **request
+                )
+            except Exception as e:
+                delay = self.retry_policy.retry_delay(attempt, e, deadline)
+                if delay is None:
+                    raise
+                print(f"Azure OpenAI attempt {attempt} failed: {str(e)}, retrying in {delay:.2f}s")
+                metrics.inc("llm_retries_total", error=type(e).__name__)
+                time.sleep(delay)
+
+    def _build_messages(
+        self,
+        user_message: str,
+        conversation_history: List[Dict],
+        current_preferences: Dict
+    ) -> Tuple[List[Dict], Dict]:
+        """Build the chat completion messages for one turn within the token budget"""
+        return self.prompt_builder.build(user_message, conversation_history, current_preferences)
+
+    def _record_usage(self, usage: Dict, response=None):
+        """Record a turn's usage, preferring the token counts reported by the API"""
+        if response is not None and response.usage is not None:
+            usage["prompt_tokens"] = response.usage.prompt_tokens
+            usage["completion_tokens"] = response.usage.completion_tokens
+        self.token_usage.record(usage)
+
+        metrics.observe("llm_prompt_tokens", usage.get("prompt_tokens") or usage["estimated_prompt_tokens"],
+                        buckets=TOKEN_BUCKETS)
+        if usage.get("completion_tokens") is not None:
+            metrics.observe("llm_completion_tokens", usage["completion_tokens"], buckets=TOKEN_BUCKETS)
+
+    def _observe_call(self, mode: str, started: float, outcome: str):
+        """Record wall time and outcome of one Azure call"""
+        metrics.observe("llm_call_seconds", time.monotonic() - started, mode=mode, outcome=outcome)
+        metrics.inc("llm_calls_total", mode=mode, outcome=outcome)
+        if outcome == "json_error":
+            metrics.inc("llm_json_decode_failures_total", mode=mode)
+
+    def _parse_result(self, content: str) -> Dict:
+        """Parse and validate the model's JSON reply"""
+        result = json.loads(content)
+
+        # Validate response structure
+        if not all(key in result for key in ["bot_message", "preferences", "ready_for_recommendations"]):
+            raise ValueError("Invalid response structure from Azure OpenAI")
+
+        return {
+            "bot_message": result.get("bot_message", ""),
+            "preferences": result.get("preferences", {}),
+            "ready_for_recommendations": result.get("ready_for_recommendations", False),
+            "confidence": result.get("confidence", 0.8)
+        }
+
     def _error_response(self, message: str) -> Dict:
         """Generate error response"""
         return {
@@ -211,3 +695,193 @@ Response:
         except Exception as e:
             print(f"Connection test failed: {str(e)}")
             return False
+
+
+class AsyncAzureOpenAIService(AzureOpenAIService):
+    """Azure OpenAI service that runs chat calls on a background asyncio loop
+
+    Upstream concurrency is bounded by a semaphore, and identical requests
+    that are in flight at the same time share one upstream call.
+    """
+
+    def __init__(self, max_concurrency: int = 16):
+        """
+        Initialize async Azure OpenAI client and its event loop
+
+        Args:
+            max_concurrency: Maximum simultaneous upstream chat calls
+        """
+        super().__init__()
+        self.async_client = AsyncAzureOpenAI(
+            api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview"),
+            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+            api_key=os.getenv("AZURE_OPENAI_KEY"),
+            timeout=self.retry_policy.default_timeout,
+            max_retries=0
+        )
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='azure-async-loop', daemon=True)
+        self._thread.start()
+
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._stats = {'upstream_calls': 0, 'coalesced': 0, 'active': 0, 'peak_active': 0}
+
+    def chat(
+        self,
+        user_message: str,
+        conversation_history: List[Dict],
+        current_preferences: Dict,
+        use_cache: bool = True,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """Send message to Azure OpenAI and wait for the structured response"""
+        result = self.submit_chat(
+            user_message, conversation_history, current_preferences, use_cache, deadline
+        ).result()
+        # Coalesced callers share one result object
+        return copy.deepcopy(result)
+
+    def submit_chat(
+        self,
+        user_message: str,
+        conversation_history: List[Dict],
+        current_preferences: Dict,
+        use_cache: bool = True,
+        deadline: Optional[float] = None
+    ) -> Future:
+        """
+        Start a chat call without blocking the calling thread
+
+        Args:
+            user_message: User's input message
+            conversation_history: Previous messages [{"role": "user|assistant", "content": "..."}]
+            current_preferences: Current extracted preferences
+            use_cache: Set False to bypass the response cache and request coalescing
+            deadline: time.monotonic() value by which the call must finish, or None
+
+        Returns:
+            Future resolving to the chat result dict (shared between coalesced callers)
+        """
+        key = self.response_cache.make_key(user_message, conversation_history, current_preferences)
+
+        if self.response_cache.enabled:
+            if use_cache:
+                cached = self.response_cache.get(key)
+                if cached is not None:
+                    cached["cached"] = True
+                    future = Future()
+                    future.set_result(cached)
+                    return future
+            else:
+                self.response_cache.count_bypass()
+
+        coroutine_args = (user_message, list(conversation_history), dict(current_preferences), deadline)
+        if not use_cache:
+            return asyncio.run_coroutine_threadsafe(self._chat_async(*coroutine_args), self._loop)
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._stats['coalesced'] += 1
+                return future
+
+            future = asyncio.run_coroutine_threadsafe(self._chat_async(*coroutine_args), self._loop)
+            self._in_flight[key] = future
+
+        future.add_done_callback(lambda f: self._settle(key, f))
+        return future
+
+    def _settle(self, key: str, future: Future):
+        """Forget a finished in-flight call and cache its result"""
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        # Never cache error responses
+        if self.response_cache.enabled and not result.get("error", False):
+            self.response_cache.put(key, result)
+
+    async def _chat_async(
+        self,
+        user_message: str,
+        conversation_history: List[Dict],
+        current_preferences: Dict,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """Call Azure OpenAI on the event loop, holding a concurrency slot"""
+        async with self._semaphore:
+            with self._lock:
+                self._stats['upstream_calls'] += 1
+                self._stats['active'] += 1
+                self._stats['peak_active'] = max(self._stats['peak_active'], self._stats['active'])
+
+            content = None
+            started = time.monotonic()
+            try:
+                messages, usage = self._build_messages(user_message, conversation_history, current_preferences)
+
+                response = await self._acreate_with_retries(
+                    deadline,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=500,
+                    response_format={"type": "json_object"}  # Force JSON output
+                )
+
+                self._record_usage(usage, response)
+
+                content = response.choices[0].message.content
+                result = self._parse_result(content)
+                self._observe_call("async", started, "ok")
+                return result
+
+            except json.JSONDecodeError as e:
+                print(f"JSON decode error: {str(e)}, Content: {content}")
+                self._observe_call("async", started, "json_error")
+                return self._error_response("I had trouble understanding that. Could you rephrase?")
+
+            except Exception as e:
+                print(f"Azure OpenAI error: {str(e)}")
+                self._observe_call("async", started, "deadline" if isinstance(e, DeadlineExceeded) else "error")
+                return self._error_response("Sorry, I'm having technical difficulties. Please try again.")
+
+            finally:
+                with self._lock:
+                    self._stats['active'] -= 1
+
+    async def _acreate_with_retries(self, deadline: Optional[float], **request):
+        """Async counterpart of _create_with_retries"""
+        attempt = 0
+        while True:
+            timeout = self.retry_policy.attempt_timeout(deadline)
+            attempt += 1
+            try:
+                return await self.async_client.with_options(timeout=timeout).chat.completions.create(
+                    model=self.deployment, **request
+                )
+            except Exception as e:
+                delay = self.retry_policy.retry_delay(attempt, e, deadline)
+                if delay is None:
+                    raise
+                print(f"Azure OpenAI attempt {attempt} failed: {str(e)}, retrying in {delay:.2f}s")
+                metrics.inc("llm_retries_total", error=type(e).__name__)
+                await asyncio.sleep(delay)
+
+    def get_concurrency_stats(self) -> Dict:
+        """Get upstream call, coalescing and concurrency counters"""
+        with self._lock:
+            return {
+                **self._stats,
+                'in_flight': len(self._in_flight),
+                'max_concurrency': self.max_concurrency
+            }
+
+    def close(self):
+        """Stop the background event loop"""
+        self._loop.call_soon_threadsafe(self._loop.stop)
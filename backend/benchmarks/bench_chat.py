@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Chat Endpoint Benchmark
+Drives /api/chat (or /api/chat/stream) through a real HTTP server backed by
+the mock Azure OpenAI server and reports throughput and latency percentiles;
+the backend runs on a throwaway SQLite database, not database/seats.db
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_azure_openai import add_server_arguments, server_from_arguments
+
+MESSAGES = [
+    "Hi! I'm looking for a seat",
+    "Something with a good view, not too expensive",
+    "I need a cheap seat",
+    "Can I sit in the front near the aisle?",
+    "show me cheaper options",
+    "What do you have in the middle section?",
+    "Under $400 with AC and a great view in the front",
+]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def post_chat(url, message, session_id, bypass_cache, stream):
+    """Send one chat request, returning (session_id, first_byte_seconds, total_seconds)"""
+    body = json.dumps({'message': message, 'session_id': session_id, 'bypass_cache': bypass_cache}).encode()
+    req = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+
+    with urllib.request.urlopen(req, timeout=60) as resp:
+        if not stream:
+            payload = json.loads(resp.read())
+            elapsed = time.perf_counter() - start
+            return payload.get('session_id'), elapsed, elapsed
+
+        first_byte = None
+        event = None
+        for raw in resp:
+            line = raw.decode().strip()
+            if line.startswith('event: '):
+                event = line[7:]
+                if event == 'delta' and first_byte is None:
+                    first_byte = time.perf_counter() - start
+            elif line.startswith('data: ') and event == 'session':
+                session_id = json.loads(line[6:])['session_id']
+            elif line.startswith('data: ') and event in ('done', 'error'):
+                break
+        total = time.perf_counter() - start
+        # Replies from the keyword parser arrive in one piece with the final event
+        return session_id, first_byte if first_byte is not None else total, total
+
+
+def run_load(base_url, concurrency, requests_per_worker, turns_per_session, bypass_cache, stream):
+    """Run the load test, returning per-request latencies and error count"""
+    url = f"{base_url}/api/chat/stream" if stream else f"{base_url}/api/chat"
+    totals, first_bytes = [], []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(worker_id):
+        session_id = None
+        for i in range(requests_per_worker):
+            if i % turns_per_session == 0:
+                session_id = None
+            message = MESSAGES[(worker_id + i) % len(MESSAGES)]
+            try:
+                session_id, first_byte, total = post_chat(url, message, session_id, bypass_cache, stream)
+            except (urllib.error.URLError, OSError, ValueError):
+                with lock:
+                    errors[0] += 1
+                continue
+            with lock:
+                totals.append(total)
+                first_bytes.append(first_byte)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return totals, first_bytes, errors[0], time.perf_counter() - start
+
+
+def report(label, values):
+    values = sorted(values)
+    print(f"  {label:<12} p50 {percentile(values, 50) * 1000:7.1f}ms  "
+          f"p95 {percentile(values, 95) * 1000:7.1f}ms  "
+          f"p99 {percentile(values, 99) * 1000:7.1f}ms  "
+          f"max {values[-1] * 1000 if values else 0:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', type=int, default=8, help='simultaneous clients')
+    parser.add_argument('--requests', type=int, default=25, help='requests per client')
+    parser.add_argument('--turns', type=int, default=4, help='messages per chat session')
+    parser.add_argument('--stream', action='store_true', help='benchmark /api/chat/stream')
+    parser.add_argument('--bypass-cache', action='store_true', help='send bypass_cache with every request')
+    parser.add_argument('--no-fast-path', action='store_true', help='send every message to Azure')
+    parser.add_argument('--app-env', action='append', default=[], metavar='NAME=VALUE',
+                        help='extra backend setting, e.g. LLM_LATENCY_BUDGET=0.5 (repeatable)')
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    mock = server_from_arguments(args)
+    threading.Thread(target=mock.serve_forever, daemon=True).start()
+
+    # Configure the backend before importing it; importing app creates its database
+    db_dir = tempfile.mkdtemp(prefix='bench_chat_')
+    os.environ.update({
+        'SEATS_DB_PATH': os.path.join(db_dir, 'seats.db'),
+        'ENABLE_AZURE_OPENAI': 'true',
+        'AZURE_OPENAI_ENDPOINT': mock.endpoint,
+        'AZURE_OPENAI_KEY': 'mock',
+        'AZURE_HEALTH_PROBE_INTERVAL': '0',
+    })
+    if args.no_fast_path:
+        os.environ['KEYWORD_FAST_PATH_CONFIDENCE'] = '0'
+    for setting in args.app_env:
+        name, _, value = setting.partition('=')
+        os.environ[name] = value
+
+    # Keep per-request access logs out of the report
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+
+    os.chdir(BACKEND_DIR)
+    from werkzeug.serving import make_server
+    import app as backend
+
+    http_server = make_server('127.0.0.1', 0, backend.app, threaded=True)
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{http_server.server_port}"
+
+    endpoint = '/api/chat/stream' if args.stream else '/api/chat'
+    print(f"{args.concurrency} clients x {args.requests} requests to {endpoint}, "
+          f"mock Azure {args.latency_dist} {args.latency_ms:.0f}ms, {args.error_rate:.0%} errors")
+
+    totals, first_bytes, errors, elapsed = run_load(
+        base_url, args.concurrency, args.requests, args.turns, args.bypass_cache, args.stream
+    )
+
+    print(f"  completed {len(totals)} requests, {errors} errors in {elapsed:.2f}s "
+          f"({len(totals) / elapsed:.1f} req/s)")
+    report('latency', totals)
+    if args.stream:
+        report('first byte', first_bytes)
+
+    with urllib.request.urlopen(f"{base_url}/api/chat/status") as resp:
+        status = json.loads(resp.read())
+    print(f"  mock Azure served: {mock.stats}")
+    print(f"  routing: {status['routing']['counts']}")
+    print(f"  circuit breaker: {status['circuit_breaker']['state']}, "
+          f"cache hit rate: {status['response_cache']['hit_rate']}")
+
+    http_server.shutdown()
+    mock.shutdown()
+    shutil.rmtree(db_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
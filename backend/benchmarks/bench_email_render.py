@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Email Rendering Benchmark
+Measures per-message cost of rendering confirmation emails from the
+compiled templates, and of turning them into MIME messages for context
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+import email_service
+import email_templates
+
+
+def make_booking(i):
+    return {
+        'booking_id': i,
+        'user_name': f'Customer {i}',
+        'user_email': f'customer{i}@example.com',
+        'booking_date': '2024-01-01T00:00:00',
+        'seat_info': {'seat_id': f'F{i % 100 + 1}', 'layer': i % 5 + 1, 'side': 'left',
+                      'position': i % 10 + 1, 'price': 500, 'seat_type': 'regular_top'}
+    }
+
+
+def timed(label, count, func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed:8.3f}s total  {elapsed / count * 1e6:10.1f} us/message")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=10000, help='confirmations to render')
+    parser.add_argument('--mime-messages', type=int, default=500,
+                        help='confirmations to serialize to MIME (slow)')
+    args = parser.parse_args()
+
+    bookings = [make_booking(i) for i in range(args.messages)]
+
+    app = Flask(__name__)
+    app.config['MAIL_DEFAULT_SENDER'] = 'bench@example.com'
+    email_service.mail.init_app(app)
+
+    print(f"Rendering {args.messages} confirmations")
+    timed('render (html + text)', args.messages, email_templates.render_confirmation, bookings)
+
+    with app.app_context():
+        timed('build Message', args.messages, email_service.build_booking_confirmation_message, bookings)
+
+        sample = bookings[:args.mime_messages]
+        messages = [email_service.build_booking_confirmation_message(b) for b in sample]
+        print(f"Serializing {len(sample)} messages to MIME")
+        timed('Message.as_bytes', len(sample), lambda msg: msg.as_bytes(), messages)
+
+
+if __name__ == '__main__':
+    main()
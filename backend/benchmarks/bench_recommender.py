@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Seat Recommender Benchmark
+Times get_recommendations with the Python and NumPy scoring engines on the
+seat inventory and checks that both return the same seats and scores
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from seat_recommender import SeatRecommender, np
+
+
+def random_preferences(rng):
+    """Random preference set covering every scoring branch"""
+    budget_max = rng.choice([None, 150, 250, 300, 400, 500, 600, 1000])
+    return {
+        'budget_max': budget_max,
+        'budget_min': rng.choice([0, 0, 100, 200]),
+        'ac_importance': rng.choice(['required', 'preferred', 'optional']),
+        'view_importance': rng.choice([0, 3, 5, 7.5, 9, 10]),
+        'famous_people': rng.random() < 0.3,
+        'position_preference': rng.choice([None, 'aisle', 'center', 'window']),
+        'location_preference': rng.choice([None, 'front', 'middle', 'back']),
+    }
+
+
+def synthetic_seats(count, rng):
+    """Seat dicts shaped like Database.get_all_seats() rows"""
+    seat_types = ['regular_bottom', 'regular_top', 'perpendicular_front']
+    seats = []
+    for i in range(count):
+        seats.append({
+            'id': i + 1,
+            'layer': rng.randint(1, 15),
+            'side': rng.choice(['left', 'right']),
+            'position': rng.randint(1, 10),
+            'price': float(rng.randrange(100, 601, 25)),
+            'is_available': 1 if rng.random() < 0.8 else 0,
+            'seat_type': rng.choice(seat_types),
+            'has_ac': 1 if rng.random() < 0.4 else 0,
+            'view_quality': rng.randint(2, 10),
+            'famous_occupant': 'A. Famous Person' if rng.random() < 0.05 else None,
+            'pros': ';'.join(['Good legroom'] * rng.randint(0, 4)),
+            'cons': ';'.join(['Near exit'] * rng.randint(0, 2)),
+        })
+    return seats
+
+
+def load_seats(args, rng):
+    if args.synthetic:
+        return synthetic_seats(args.synthetic, rng)
+    os.chdir(BACKEND_DIR)
+    from database import Database
+    return Database().get_all_seats()
+
+
+def time_engine(recommender, preference_sets, limit):
+    start = time.perf_counter()
+    results = [recommender.get_recommendations(prefs, limit) for prefs in preference_sets]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--queries', type=int, default=500, help='preference sets to score')
+    parser.add_argument('--limit', type=int, default=5, help='recommendations per query')
+    parser.add_argument('--synthetic', type=int, default=0, metavar='N',
+                        help='score N generated seats instead of the database inventory')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    if np is None:
+        print("numpy is not installed; only the python engine is available")
+        return 1
+
+    rng = random.Random(args.seed)
+    seats = load_seats(args, rng)
+    preference_sets = [random_preferences(rng) for _ in range(args.queries)]
+
+    python_engine = SeatRecommender(seats, engine='python')
+    numpy_engine = SeatRecommender(seats, engine='numpy')
+    print(f"{len(python_engine.available_seats)} available seats, "
+          f"{args.queries} queries, limit {args.limit}")
+
+    # Full score vectors must match score_seat for every seat
+    for prefs in preference_sets:
+        expected = [python_engine.score_seat(seat, prefs)[0] for seat in python_engine.all_seats]
+        if numpy_engine._scorer.score(prefs).tolist() != expected:
+            print(f"  MISMATCH in scores for {prefs}")
+            return 1
+
+    python_time, python_results = time_engine(python_engine, preference_sets, args.limit)
+    numpy_time, numpy_results = time_engine(numpy_engine, preference_sets, args.limit)
+
+    if python_results != numpy_results:
+        print("  MISMATCH in recommendations")
+        return 1
+
+    for label, elapsed in (('python', python_time), ('numpy', numpy_time)):
+        print(f"  {label:<7} {elapsed * 1000 / args.queries:8.3f}ms per query")
+    print(f"  speedup {python_time / numpy_time:.1f}x, results identical")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+SMTP Sending Benchmark
+Compares one-connection-per-message sending with pooled send_bulk()
+against a local SMTP stand-in (no real mail is sent)
+"""
+
+import argparse
+import os
+import socketserver
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+import email_service
+
+
+class SinkHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP server that accepts and discards every message"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        # Simulate the TCP/TLS/login cost a real server charges per connection
+        time.sleep(self.server.handshake_delay)
+        self.reply("220 localhost SMTP sink ready")
+
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors='replace').strip().upper()
+
+            if command.startswith(('EHLO', 'HELO')):
+                self.reply("250 localhost")
+            elif command == 'DATA':
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                self.server.received += 1
+                self.reply("250 OK: queued")
+            elif command == 'QUIT':
+                self.reply("221 Bye")
+                return
+            else:
+                # MAIL FROM, RCPT TO, RSET, NOOP
+                self.reply("250 OK")
+
+
+class SinkServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, handshake_delay):
+        super().__init__(('127.0.0.1', 0), SinkHandler)
+        self.handshake_delay = handshake_delay
+        self.received = 0
+
+
+def build_messages(app, count):
+    booking_data = {
+        'booking_id': 1,
+        'user_name': 'Benchmark User',
+        'user_email': 'bench@example.com',
+        'booking_date': '2024-01-01T00:00:00',
+        'seat_info': {'seat_id': 'F1', 'layer': 1, 'side': 'left', 'position': 1,
+                      'price': 500, 'seat_type': 'regular_top'}
+    }
+    with app.app_context():
+        return [email_service.build_booking_confirmation_message(booking_data) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=200, help='messages per run')
+    parser.add_argument('--handshake-ms', type=float, default=20.0,
+                        help='simulated per-connection handshake latency')
+    args = parser.parse_args()
+
+    server = SinkServer(args.handshake_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ.update({
+        'MAIL_SERVER': '127.0.0.1',
+        'MAIL_PORT': str(server.server_address[1]),
+        'MAIL_USE_TLS': 'False',
+        'MAIL_USE_SSL': 'False',
+        'MAIL_DEFAULT_SENDER': 'bench@example.com',
+        'EMAIL_WORKERS': '1',
+    })
+    os.environ.pop('MAIL_USERNAME', None)
+    os.environ.pop('MAIL_PASSWORD', None)
+
+    app = Flask(__name__)
+    email_service.init_mail(app)
+    messages = build_messages(app, args.messages)
+
+    print(f"Sending {args.messages} messages, {args.handshake_ms:.0f}ms simulated handshake")
+
+    with app.app_context():
+        start = time.perf_counter()
+        for msg in messages:
+            email_service.mail.send(msg)
+        per_message = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sent, failures = email_service.send_bulk(messages)
+        bulk = time.perf_counter() - start
+
+    print(f"  mail.send per message: {per_message:.3f}s ({args.messages / per_message:.0f} msg/s)")
+    print(f"  send_bulk:             {bulk:.3f}s ({args.messages / bulk:.0f} msg/s), "
+          f"{sent} sent, {len(failures)} failed")
+    print(f"  speedup: {per_message / bulk:.1f}x, sink received {server.received}")
+    print(f"  session stats: {email_service.bulk_session.get_stats()}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker Check
+Walks AzureNLPProcessor's circuit breaker through open -> half_open -> closed
+against the mock Azure OpenAI server and checks that cached replies never
+hold the half-open trial slot (which would keep chat on the keyword fallback)
+"""
+
+import os
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_azure_openai import LatencyModel, MockAzureOpenAIServer
+
+RESET_SECONDS = 0.2
+CACHED_MESSAGE = "Hi! I'm looking for a seat"
+
+
+def check(condition, description):
+    print(f"  {'ok  ' if condition else 'FAIL'} {description}")
+    return condition
+
+
+def consume(events):
+    """Run a stream_message generator to its final result"""
+    result = None
+    for event in events:
+        if event["type"] == "result":
+            result = event["result"]
+    return result
+
+
+def trip_and_recover(processor, mock, send, label):
+    """Open the breaker, answer a cached message while open, then recover"""
+    ok = True
+    processor.breaker.record_success()
+
+    mock.error_rate = 1.0
+    send(f"{label}: this call fails")
+    ok &= check(processor.breaker.get_status()['state'] == 'open', f"{label}: failure opens the breaker")
+
+    time.sleep(RESET_SECONDS * 1.5)
+    mock.error_rate = 0.0
+    reply = send(CACHED_MESSAGE)
+    ok &= check(reply.get('cached', False), f"{label}: cached reply served while the breaker is open")
+
+    requests_before = mock.stats['requests']
+    reply = send(f"{label}: this call reaches Azure")
+    ok &= check(mock.stats['requests'] > requests_before and not reply.get('cached', False),
+                f"{label}: next uncached message gets the half-open trial")
+    ok &= check(processor.breaker.get_status()['state'] == 'closed', f"{label}: successful trial closes the breaker")
+    return ok
+
+
+def main():
+    mock = MockAzureOpenAIServer(latency=LatencyModel('fixed', 20.0, 0.0, 5.0))
+    threading.Thread(target=mock.serve_forever, daemon=True).start()
+
+    os.environ.update({
+        'ENABLE_AZURE_OPENAI': 'true',
+        'AZURE_OPENAI_ENDPOINT': mock.endpoint,
+        'AZURE_OPENAI_KEY': 'mock',
+        'AZURE_HEALTH_PROBE_INTERVAL': '0',
+        'AZURE_BREAKER_FAILURES': '1',
+        'AZURE_BREAKER_RESET_SECONDS': str(RESET_SECONDS),
+        'LLM_MAX_ATTEMPTS': '1',
+        'KEYWORD_FAST_PATH_CONFIDENCE': '0',
+    })
+    from nlp_processor_azure import AzureNLPProcessor
+
+    processor = AzureNLPProcessor()
+    ok = True
+    try:
+        # Warm the response cache
+        processor.process_message(CACHED_MESSAGE, [], {})
+
+        ok &= trip_and_recover(
+            processor, mock, lambda message: processor.process_message(message, [], {}), 'chat'
+        )
+        ok &= trip_and_recover(
+            processor, mock, lambda message: consume(processor.stream_message(message, [], {})), 'stream'
+        )
+
+        # A cached result that still reaches the breaker must free the trial
+        processor.breaker.record_failure()
+        time.sleep(RESET_SECONDS * 1.5)
+        processor.breaker.allow_request()
+        processor._record_azure_result({'bot_message': 'cached', 'cached': True})
+        ok &= check(processor.breaker.allow_request(), "cached result releases the half-open trial")
+    finally:
+        processor.stop()
+        mock.shutdown()
+
+    print("all checks passed" if ok else "circuit breaker checks FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
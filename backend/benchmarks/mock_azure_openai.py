@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Mock Azure OpenAI Server
+Local stand-in for the chat-completions endpoint used by AzureOpenAIService,
+with configurable latency, error rates and canned JSON replies (no quota used)
+
+Point the backend at it with:
+    AZURE_OPENAI_ENDPOINT=http://127.0.0.1:<port> AZURE_OPENAI_KEY=mock
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHAT_PATH = re.compile(r'^/openai/deployments/([^/]+)/chat/completions$')
+
+# Replies are matched on keywords in the latest user message, first match wins
+DEFAULT_REPLIES = [
+    {
+        "match": ["cheap", "cheaper", "budget", "$"],
+        "reply": {
+            "bot_message": "Got it! I'll look for seats that fit your budget. Is air conditioning important to you?",
+            "preferences": {"budget_max": 300},
+            "ready_for_recommendations": False,
+            "confidence": 0.75
+        }
+    },
+    {
+        "match": ["view", "front", "aisle", "center"],
+        "reply": {
+            "bot_message": "Great choice! I'll prioritize seats with an excellent view. Let me pull up the best options! 🎯",
+            "preferences": {"view_importance": 9, "location_preference": "front"},
+            "ready_for_recommendations": True,
+            "confidence": 0.9
+        }
+    },
+    {
+        "match": [],
+        "reply": {
+            "bot_message": "Happy to help you find a seat! What's your budget, and is a great view or AC most important?",
+            "preferences": {},
+            "ready_for_recommendations": False,
+            "confidence": 0.5
+        }
+    }
+]
+
+
+class LatencyModel:
+    """Samples response latencies from a configurable distribution"""
+
+    DISTRIBUTIONS = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+    def __init__(self, distribution='lognormal', mean_ms=400.0, spread=0.5, first_token_ms=150.0):
+        """
+        Initialize latency model
+
+        Args:
+            distribution: One of fixed, uniform, exponential, lognormal
+            mean_ms: Mean total response time in milliseconds
+            spread: Relative spread (uniform half-width / lognormal sigma)
+            first_token_ms: Mean time to first token for streamed responses
+        """
+        self.distribution = distribution
+        self.mean_ms = mean_ms
+        self.spread = spread
+        self.first_token_ms = first_token_ms
+
+    def sample(self) -> float:
+        """Sample a total response time in seconds"""
+        if self.distribution == 'fixed':
+            ms = self.mean_ms
+        elif self.distribution == 'uniform':
+            ms = random.uniform(self.mean_ms * (1 - self.spread), self.mean_ms * (1 + self.spread))
+        elif self.distribution == 'exponential':
+            ms = random.expovariate(1 / self.mean_ms) if self.mean_ms > 0 else 0.0
+        else:
+            # Shift mu so the distribution's mean stays at mean_ms
+            if self.mean_ms > 0:
+                ms = random.lognormvariate(math.log(self.mean_ms) - self.spread ** 2 / 2, self.spread)
+            else:
+                ms = 0.0
+        return max(0.0, ms) / 1000
+
+    def first_token(self, total: float) -> float:
+        """Time to first token, never more than the total response time"""
+        return min(total, self.first_token_ms / 1000)
+
+
+class MockAzureOpenAIServer(ThreadingHTTPServer):
+    """HTTP server answering chat completions with canned replies"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0, latency=None, error_rate=0.0, error_status=500, replies=None, chunk_chars=8):
+        """
+        Initialize mock server
+
+        Args:
+            port: Port to listen on (0 picks a free port)
+            latency: LatencyModel (default: lognormal, 400ms mean)
+            error_rate: Fraction of requests answered with error_status
+            error_status: HTTP status for injected errors (e.g. 429, 500, 503)
+            replies: Canned replies in DEFAULT_REPLIES format
+            chunk_chars: Characters of content per streamed chunk
+        """
+        super().__init__(('127.0.0.1', port), MockAzureOpenAIHandler)
+        self.latency = latency or LatencyModel()
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.replies = replies or DEFAULT_REPLIES
+        self.chunk_chars = chunk_chars
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'streamed': 0, 'errors_injected': 0}
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def pick_reply(self, messages) -> dict:
+        """Choose the canned reply for the latest user message"""
+        user_text = next((m.get('content', '') for m in reversed(messages) if m.get('role') == 'user'), '')
+        # Ignore the preference context appended by the prompt builder
+        user_text = user_text.split('\n\n[', 1)[0].lower()
+        for entry in self.replies:
+            if not entry.get('match') or any(word in user_text for word in entry['match']):
+                return entry['reply']
+        return self.replies[-1]['reply']
+
+
+class MockAzureOpenAIHandler(BaseHTTPRequestHandler):
+    """Implements the subset of the chat-completions API the backend uses"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        match = CHAT_PATH.match(self.path.split('?', 1)[0])
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+
+        if not match:
+            self.send_json(404, {"error": {"code": "404", "message": "Resource not found"}})
+            return
+        if not self.headers.get('api-key') and not self.headers.get('Authorization'):
+            self.send_json(401, {"error": {"code": "401", "message": "Access denied due to missing key"}})
+            return
+
+        server.count('requests')
+        total = server.latency.sample()
+
+        if random.random() < server.error_rate:
+            server.count('errors_injected')
+            time.sleep(total)
+            self.send_json(server.error_status, {
+                "error": {"code": str(server.error_status), "message": "Injected error from mock server"}
+            })
+            return
+
+        messages = body.get('messages', [])
+        json_mode = (body.get('response_format') or {}).get('type') == 'json_object'
+        content = json.dumps(server.pick_reply(messages)) if json_mode else "Hello! This is the mock Azure OpenAI server."
+        usage = {
+            "prompt_tokens": sum(len(m.get('content', '')) for m in messages) // 4 + 4 * len(messages),
+            "completion_tokens": len(content) // 4,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        model = match.group(1)
+
+        if body.get('stream'):
+            server.count('streamed')
+            self.stream_reply(model, content, total)
+            return
+
+        time.sleep(total)
+        self.send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        })
+
+    def stream_reply(self, model, content, total):
+        """Send content as server-sent chat.completion.chunk events"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        size = self.server.chunk_chars
+        pieces = [content[i:i + size] for i in range(0, len(content), size)] or ['']
+        first_token = self.server.latency.first_token(total)
+        per_chunk = (total - first_token) / len(pieces)
+
+        def send_event(payload):
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+            self.wfile.flush()
+
+        def chunk(delta, finish_reason=None):
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+
+        # Azure sends prompt filter results first, in a chunk without choices
+        send_event({"id": "", "object": "", "created": 0, "model": "", "choices": [],
+                    "prompt_filter_results": [{"prompt_index": 0, "content_filter_results": {}}]})
+        time.sleep(first_token)
+        send_event(chunk({"role": "assistant", "content": ""}))
+        for piece in pieces:
+            send_event(chunk({"content": piece}))
+            time.sleep(per_chunk)
+        send_event(chunk({}, finish_reason="stop"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def load_replies(path):
+    """Load canned replies from a JSON file in DEFAULT_REPLIES format"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def add_server_arguments(parser):
+    """Add the mock server's options to an argument parser"""
+    parser.add_argument('--latency-dist', choices=LatencyModel.DISTRIBUTIONS, default='lognormal',
+                        help='response latency distribution')
+    parser.add_argument('--latency-ms', type=float, default=400.0, help='mean response latency')
+    parser.add_argument('--latency-spread', type=float, default=0.5,
+                        help='uniform half-width fraction or lognormal sigma')
+    parser.add_argument('--first-token-ms', type=float, default=150.0,
+                        help='time to first token for streamed responses')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests that fail')
+    parser.add_argument('--error-status', type=int, default=500, help='HTTP status for injected failures')
+    parser.add_argument('--replies', help='JSON file of canned replies (see DEFAULT_REPLIES)')
+
+
+def server_from_arguments(args, port=0):
+    """Create a MockAzureOpenAIServer from parsed arguments"""
+    return MockAzureOpenAIServer(
+        port=port,
+        latency=LatencyModel(args.latency_dist, args.latency_ms, args.latency_spread, args.first_token_ms),
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        replies=load_replies(args.replies) if args.replies else None
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8089, help='port to listen on')
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = server_from_arguments(args, port=args.port)
+    print(f"Mock Azure OpenAI listening on {server.endpoint} "
+          f"({args.latency_dist} {args.latency_ms:.0f}ms, {args.error_rate:.0%} errors)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Served: {server.stats}")
+
+
+if __name__ == '__main__':
+    main()
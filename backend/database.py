@@ -1,14 +1,301 @@
 import sqlite3
 import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
+
+class ConnectionPool:
+    """Thread-safe pool of reusable SQLite connections"""
+
+    # Pragmas applied once to every new connection
+    PRAGMAS = (
+        'PRAGMA journal_mode = WAL',
+        'PRAGMA synchronous = NORMAL',
+        'PRAGMA cache_size = -16000',       # ~16MB page cache per connection
+        'PRAGMA mmap_size = 268435456',     # 256MB memory-mapped I/O
+        'PRAGMA temp_store = MEMORY',
+        'PRAGMA busy_timeout = 5000',
+    )
+
+    def __init__(self, db_path, pool_size=5):
+        """
+        Initialize connection pool
+
+        Args:
+            db_path: Path to the SQLite database file
+            pool_size: Maximum number of idle connections kept open
+        """
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._discarded = 0
+
+    def _connect(self):
+        """Open a new connection with the tuned pragmas"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        """
+        Get a connection for the current thread
+
+        Nested acquires on the same thread reuse the same connection.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.depth += 1
+            with self._lock:
+                self._hits += 1
+            return conn
+
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self._hits += 1
+        except queue.Empty:
+            conn = self._connect()
+            with self._lock:
+                self._misses += 1
+
+        self._local.conn = conn
+        self._local.depth = 1
+        return conn
+
+    def release(self, conn):
+        """Return the current thread's connection to the pool"""
+        self._local.depth -= 1
+        if self._local.depth > 0:
+            return
+
+        self._local.conn = None
+
+        # Never hand a connection with an open transaction to another caller
+        if conn.in_transaction:
+            conn.rollback()
+
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+            with self._lock:
+                self._discarded += 1
+
+    def close_all(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def get_stats(self):
+        """
+        Get pool usage statistics
+
+        Returns:
+            dict: Pool size, idle connections and hit/miss counters
+        """
+        with self._lock:
+            hits, misses, discarded = self._hits, self._misses, self._discarded
+
+        total = hits + misses
+        return {
+            'pool_size': self.pool_size,
+            'idle_connections': self._idle.qsize(),
+            'hits': hits,
+            'misses': misses,
+            'discarded': discarded,
+            'hit_rate': round(hits / total, 4) if total else 0.0
+        }
+
+
+class SeatInventoryCache:
+    """In-process copy of the seat inventory, kept current by write-through"""
+
+    def __init__(self, ttl_seconds=0):
+        """
+        Initialize seat cache
+
+        Args:
+            ttl_seconds: Reload after this many seconds to pick up writes made
+                         outside this process (e.g. migrate_seats.py); 0 disables
+        """
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._seats = None
+        self._by_id = {}
+        self._id_by_code = {}
+        self._seat_revisions = {}
+        self._version = 0
+        # Revision through which every write is reflected in the cached seats;
+        # writes applied out of order wait in _pending until the gap closes
+        self._applied_through = 0
+        self._pending = set()
+        self._loaded_at = 0.0
+        self._hits = 0
+        self._misses = 0
+        self._loads = 0
+
+    def _is_fresh(self):
+        if self._seats is None:
+            return False
+        if self.ttl_seconds and time.monotonic() - self._loaded_at > self.ttl_seconds:
+            return False
+        return True
+
+    def get_all(self):
+        """
+        Get copies of all cached seats with the revision they reflect
+
+        Returns:
+            tuple: (revision, seats), or None if a reload is needed
+        """
+        with self._lock:
+            if not self._is_fresh():
+                self._misses += 1
+                return None
+            self._hits += 1
+            return self._applied_through, [dict(seat) for seat in self._seats]
+
+    def get(self, seat_id):
+        """
+        Get a copy of one cached seat
+
+        Returns:
+            tuple: (found_in_cache: bool, seat dict or None)
+        """
+        with self._lock:
+            if not self._is_fresh():
+                self._misses += 1
+                return False, None
+            self._hits += 1
+            seat = self._by_id.get(seat_id)
+            return True, dict(seat) if seat else None
+
+    def get_id_by_code(self, seat_code):
+        """
+        Look up a seat ID by seat code
+
+        Returns:
+            tuple: (found_in_cache: bool, seat ID or None)
+        """
+        with self._lock:
+            if not self._is_fresh():
+                return False, None
+            return True, self._id_by_code.get(seat_code)
+
+    def load(self, seats, seat_revisions, version):
+        """Replace the cache contents with a fresh snapshot"""
+        with self._lock:
+            # A write committed after this snapshot was read; let the next
+            # read reload rather than install stale state
+            if version < self._version:
+                return
+            self._seats = seats
+            self._by_id = {seat['id']: seat for seat in seats}
+            self._id_by_code = {seat['seat_code']: seat['id'] for seat in seats if seat.get('seat_code')}
+            self._seat_revisions = seat_revisions
+            self._version = version
+            self._applied_through = version
+            self._pending = set()
+            self._loaded_at = time.monotonic()
+            self._loads += 1
+
+    def apply(self, seat_ids, revision, **fields):
+        """
+        Update cached seats in place after a committed write
+
+        Updates stamped with an older revision than the cached seat are
+        ignored, so out-of-order appliers cannot resurrect stale state.
+        """
+        with self._lock:
+            self._version = max(self._version, revision)
+            if self._seats is None:
+                return
+            for seat_id in seat_ids:
+                seat = self._by_id.get(seat_id)
+                if seat is None:
+                    self._seats = None
+                    return
+                if self._seat_revisions.get(seat_id, 0) >= revision:
+                    continue
+                seat.update(fields)
+                self._seat_revisions[seat_id] = revision
+
+            if revision > self._applied_through:
+                self._pending.add(revision)
+                while self._applied_through + 1 in self._pending:
+                    self._applied_through += 1
+                    self._pending.remove(self._applied_through)
+
+    def invalidate(self):
+        """Drop the cached inventory"""
+        with self._lock:
+            self._seats = None
+            self._version = 0
+
+    def get_stats(self):
+        """
+        Get cache statistics
+
+        Returns:
+            dict: Version stamp, size and hit/miss counters
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'version': self._version,
+                'applied_through': self._applied_through,
+                'cached_seats': len(self._seats) if self._seats is not None else 0,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self._hits,
+                'misses': self._misses,
+                'loads': self._loads,
+                'hit_rate': round(self._hits / total, 4) if total else 0.0
+            }
+
+
 class Database:
-    def __init__(self, db_path=None):
+    # Seat code prefix per seat type, e.g. F12 / M3 / B40
+    SEAT_CODE_PREFIXES = {
+        'regular_top': 'F',
+        'perpendicular_front': 'M',
+        'regular_bottom': 'B'
+    }
+
+    # Seat columns captured in booking records
+    SEAT_SNAPSHOT_COLUMNS = 'id, layer, side, position, price, seat_type, seat_code'
+
+    # Bounded retry policy for SQLITE_BUSY on write transactions
+    BUSY_RETRIES = 5
+    BUSY_BACKOFF_BASE = 0.01
+    BUSY_BACKOFF_MAX = 0.25
+
+    def __init__(self, db_path=None, pool_size=None, cache_ttl=None):
+        if db_path is None:
+            db_path = os.getenv('SEATS_DB_PATH')
         if db_path is None:
             # Use absolute path to the database in the project root
             db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database', 'seats.db')
+        if pool_size is None:
+            pool_size = int(os.getenv('DB_POOL_SIZE', 5))
         self.db_path = db_path
         self._ensure_directory()
+        if cache_ttl is None:
+            cache_ttl = float(os.getenv('SEAT_CACHE_TTL', 0))
+        self.pool = ConnectionPool(db_path, pool_size=pool_size)
+        self.seat_cache = SeatInventoryCache(ttl_seconds=cache_ttl)
         self._initialize_database()
 
     def _ensure_directory(self):
@@ -17,54 +304,148 @@ class Database:
         if db_dir and not os.path.exists(db_dir):
             os.makedirs(db_dir)
 
+    @contextmanager
     def _get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Borrow a pooled database connection"""
+        conn = self.pool.acquire()
+        try:
+            yield conn
+        finally:
+            self.pool.release(conn)
+
+    @staticmethod
+    def _is_busy_error(error):
+        """Check if an error is SQLITE_BUSY / SQLITE_LOCKED"""
+        code = getattr(error, 'sqlite_errorcode', None)
+        if code is not None:
+            return code in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+        return 'locked' in str(error) or 'busy' in str(error)
+
+    def _run_write(self, operation):
+        """
+        Run a write operation, retrying with jittered backoff on SQLITE_BUSY
+
+        Args:
+            operation: Callable taking a connection; it must open its own
+                       BEGIN IMMEDIATE transaction and commit it
+
+        Returns:
+            Whatever the operation returns
+        """
+        attempt = 0
+        while True:
+            try:
+                with self._get_connection() as conn:
+                    try:
+                        return operation(conn)
+                    except Exception:
+                        conn.rollback()
+                        raise
+            except sqlite3.OperationalError as e:
+                attempt += 1
+                if not self._is_busy_error(e) or attempt > self.BUSY_RETRIES:
+                    raise
+                delay = min(self.BUSY_BACKOFF_MAX, self.BUSY_BACKOFF_BASE * (2 ** (attempt - 1)))
+                time.sleep(random.uniform(0, delay))
+
+    def _bump_revision(self, cursor, seat_ids):
+        """
+        Advance the inventory revision and stamp it on the changed seats
+
+        Must run inside the caller's write transaction.
+
+        Returns:
+            int: The new inventory revision
+        """
+        cursor.execute("UPDATE inventory_meta SET value = value + 1 WHERE key = 'revision'")
+        cursor.execute("SELECT value FROM inventory_meta WHERE key = 'revision'")
+        revision = cursor.fetchone()['value']
+        cursor.executemany(
+            'UPDATE seats SET revision = ? WHERE id = ?',
+            [(revision, seat_id) for seat_id in seat_ids]
+        )
+        return revision
+
+    def get_pool_stats(self):
+        """Get connection pool hit/miss statistics"""
+        return self.pool.get_stats()
+
+    def get_cache_stats(self):
+        """Get seat inventory cache statistics"""
+        return self.seat_cache.get_stats()
+
+    def invalidate_seat_cache(self):
+        """Force the next read to reload the seat inventory from SQLite"""
+        self.seat_cache.invalidate()
 
     def _initialize_database(self):
         """Create tables if they don't exist"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
 
-        # Create seats table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS seats (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                layer INTEGER NOT NULL,
-                side TEXT,
-                position INTEGER NOT NULL,
-                price REAL NOT NULL,
-                is_available INTEGER DEFAULT 1,
-                seat_type TEXT DEFAULT 'regular',
-                UNIQUE(layer, side, position)
-            )
-        ''')
-
-        # Create bookings table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS bookings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                seat_id INTEGER NOT NULL,
-                user_name TEXT NOT NULL,
-                user_email TEXT NOT NULL,
-                booking_date TEXT NOT NULL,
-                payment_status TEXT DEFAULT 'pending',
-                FOREIGN KEY (seat_id) REFERENCES seats (id)
+            # Create seats table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS seats (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    layer INTEGER NOT NULL,
+                    side TEXT,
+                    position INTEGER NOT NULL,
+                    price REAL NOT NULL,
+                    is_available INTEGER DEFAULT 1,
+                    seat_type TEXT DEFAULT 'regular',
+                    revision INTEGER DEFAULT 0,
+                    seat_code TEXT,
+                    UNIQUE(layer, side, position)
+                )
+            ''')
+
+            # Databases created before these columns existed need them added
+            cursor.execute('PRAGMA table_info(seats)')
+            columns = [row['name'] for row in cursor.fetchall()]
+            if 'revision' not in columns:
+                cursor.execute('ALTER TABLE seats ADD COLUMN revision INTEGER DEFAULT 0')
+            if 'seat_code' not in columns:
+                cursor.execute('ALTER TABLE seats ADD COLUMN seat_code TEXT')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_seats_revision ON seats (revision)')
+            cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_seats_seat_code ON seats (seat_code)')
+
+            # Monotonic inventory revision, bumped on every availability change
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS inventory_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            ''')
+            cursor.execute(
+                "INSERT OR IGNORE INTO inventory_meta (key, value) VALUES ('revision', 0)"
             )
-        ''')
 
-        conn.commit()
+            # Create bookings table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS bookings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    seat_id INTEGER NOT NULL,
+                    user_name TEXT NOT NULL,
+                    user_email TEXT NOT NULL,
+                    booking_date TEXT NOT NULL,
+                    payment_status TEXT DEFAULT 'pending',
+                    FOREIGN KEY (seat_id) REFERENCES seats (id)
+                )
+            ''')
+
+            conn.commit()
 
-        # Check if seats are already populated
-        cursor.execute('SELECT COUNT(*) as count FROM seats')
-        count = cursor.fetchone()['count']
+            # Check if seats are already populated
+            cursor.execute('SELECT COUNT(*) as count FROM seats')
+            count = cursor.fetchone()['count']
 
-        if count == 0:
-            self._seed_seats(conn)
+            if count == 0:
+                self._seed_seats(conn)
 
-        conn.close()
+            # Label any seats added since the layout was last coded
+            cursor.execute('SELECT COUNT(*) as count FROM seats WHERE seat_code IS NULL')
+            if cursor.fetchone()['count'] > 0:
+                self._assign_seat_codes(conn)
 
     def _seed_seats(self, conn):
         """Seed initial seat data"""
@@ -117,54 +498,202 @@ class Database:
 
         conn.commit()
 
+    def _assign_seat_codes(self, conn):
+        """
+        Compute human-facing seat codes (F1, M1, B1, ...) for the layout
+
+        Codes number each section continuously: top regular seats (F) and
+        bottom regular seats (B) by layer, side, position; perpendicular
+        front seats (M) by layer, position.
+        """
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, layer, side, position, seat_type FROM seats')
+        seats = cursor.fetchall()
+
+        codes = []
+        for seat_type, prefix in self.SEAT_CODE_PREFIXES.items():
+            section = sorted(
+                (seat for seat in seats if seat['seat_type'] == seat_type),
+                key=lambda seat: (seat['layer'], seat['side'] or '', seat['position'])
+            )
+            codes.extend((f"{prefix}{idx + 1}", seat['id']) for idx, seat in enumerate(section))
+
+        coded = {seat_id for _, seat_id in codes}
+        codes.extend((f"SEAT-{seat['id']}", seat['id']) for seat in seats if seat['id'] not in coded)
+
+        # Clear first so renumbering cannot collide on the unique index
+        cursor.execute('UPDATE seats SET seat_code = NULL')
+        cursor.executemany('UPDATE seats SET seat_code = ? WHERE id = ?', codes)
+        conn.commit()
+
+    def _load_seat_cache(self):
+        """Read the full seat inventory into the cache"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+
+            # Read the revision and the seats from one snapshot
+            cursor.execute('BEGIN')
+            cursor.execute("SELECT value FROM inventory_meta WHERE key = 'revision'")
+            version = cursor.fetchone()['value']
+
+            cursor.execute('''
+                SELECT s.id, s.layer, s.side, s.position, s.price, s.is_available, s.seat_type,
+                       s.has_ac, s.view_quality, s.famous_occupant, s.pros, s.cons,
+                       s.seat_code, b.user_name, b.user_email, s.revision
+                FROM seats s
+                LEFT JOIN bookings b ON s.id = b.seat_id AND s.is_available = 0
+                ORDER BY s.seat_type, s.layer, s.side, s.position
+            ''')
+            rows = cursor.fetchall()
+            conn.commit()
+
+        seats = []
+        seat_revisions = {}
+        for row in rows:
+            seat = dict(row)
+            seat_revisions[seat['id']] = seat.pop('revision')
+            seats.append(seat)
+
+        self.seat_cache.load(seats, seat_revisions, version)
+        return version, [dict(seat) for seat in seats]
+
     def get_all_seats(self):
         """Get all seats with their status"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        return self.get_all_seats_with_revision()[1]
 
-        cursor.execute('''
-            SELECT s.id, s.layer, s.side, s.position, s.price, s.is_available, s.seat_type,
-                   s.has_ac, s.view_quality, s.famous_occupant, s.pros, s.cons,
-                   b.user_name, b.user_email
-            FROM seats s
-            LEFT JOIN bookings b ON s.id = b.seat_id AND s.is_available = 0
-            ORDER BY s.seat_type, s.layer, s.side, s.position
-        ''')
+    def get_all_seats_with_revision(self):
+        """
+        Get all seats together with the inventory revision they reflect
 
-        seats = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return seats
+        Returns:
+            tuple: (revision, seats); poll get_seat_changes(revision) for
+                   anything newer
+        """
+        cached = self.seat_cache.get_all()
+        if cached is None:
+            cached = self._load_seat_cache()
+        return cached
 
     def get_seat_by_id(self, seat_id):
         """Get specific seat by ID"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        cached, seat = self.seat_cache.get(seat_id)
+        if cached:
+            return seat
 
-        cursor.execute('''
-            SELECT s.id, s.layer, s.side, s.position, s.price, s.is_available, s.seat_type,
-                   s.has_ac, s.view_quality, s.famous_occupant, s.pros, s.cons,
-                   b.user_name, b.user_email
-            FROM seats s
-            LEFT JOIN bookings b ON s.id = b.seat_id AND s.is_available = 0
-            WHERE s.id = ?
-        ''', (seat_id,))
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
 
-        seat = cursor.fetchone()
-        conn.close()
-        return dict(seat) if seat else None
-
-    def create_booking(self, seat_id, user_name, user_email):
-        """Create a new booking"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+            cursor.execute('''
+                SELECT s.id, s.layer, s.side, s.position, s.price, s.is_available, s.seat_type,
+                       s.has_ac, s.view_quality, s.famous_occupant, s.pros, s.cons,
+                       s.seat_code, b.user_name, b.user_email
+                FROM seats s
+                LEFT JOIN bookings b ON s.id = b.seat_id AND s.is_available = 0
+                WHERE s.id = ?
+            ''', (seat_id,))
 
-        try:
-            # Check if seat is available
-            cursor.execute('SELECT is_available FROM seats WHERE id = ?', (seat_id,))
             seat = cursor.fetchone()
+            return dict(seat) if seat else None
+
+    def get_seat_by_code(self, seat_code):
+        """Get specific seat by its seat code (e.g. F12)"""
+        seat_code = seat_code.upper()
+        cached, seat_id = self.seat_cache.get_id_by_code(seat_code)
+        if cached:
+            return self.get_seat_by_id(seat_id) if seat_id is not None else None
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('SELECT id FROM seats WHERE seat_code = ?', (seat_code,))
+            row = cursor.fetchone()
+
+        return self.get_seat_by_id(row['id']) if row else None
+
+    def get_inventory_revision(self):
+        """Get the current inventory revision"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM inventory_meta WHERE key = 'revision'")
+            return cursor.fetchone()['value']
+
+    def get_seat_changes(self, since):
+        """
+        Get seats whose availability changed after a given revision
+
+        Args:
+            since: Inventory revision the client last saw
+
+        Returns:
+            dict: Current revision, changed seats and whether the client
+                  must discard its state (revision ahead of the server)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+
+            # Read the revision and the changes from one snapshot
+            cursor.execute('BEGIN')
+            cursor.execute("SELECT value FROM inventory_meta WHERE key = 'revision'")
+            revision = cursor.fetchone()['value']
+
+            # A client ahead of us saw a different database; resync everything
+            full_resync = since > revision
+            if full_resync:
+                since = -1
+
+            cursor.execute('''
+                SELECT s.id, s.is_available, s.revision, b.user_name, b.user_email
+                FROM seats s
+                LEFT JOIN bookings b ON s.id = b.seat_id AND s.is_available = 0
+                WHERE s.revision > ?
+                ORDER BY s.revision
+            ''', (since,))
+            changes = [dict(row) for row in cursor.fetchall()]
+            conn.commit()
 
-            if not seat or seat['is_available'] == 0:
-                conn.close()
+            return {
+                'revision': revision,
+                'changes': changes,
+                'full_resync': full_resync
+            }
+
+    @staticmethod
+    def _booking_record(booking_id, seat, user_name, user_email, booking_date):
+        """Build a booking record from data already in hand"""
+        return {
+            'id': booking_id,
+            'seat_id': seat['id'],
+            'seat_code': seat['seat_code'],
+            'user_name': user_name,
+            'user_email': user_email,
+            'booking_date': booking_date,
+            'payment_status': 'pending',
+            'seat': seat
+        }
+
+    def create_booking(self, seat_id, user_name, user_email):
+        """
+        Create a new booking
+
+        The seat is claimed with a single compare-and-set UPDATE inside a
+        BEGIN IMMEDIATE transaction, so concurrent bookings for the same
+        seat cannot both succeed.
+
+        Returns:
+            dict: The booking record (id, booking_date, seat snapshot and
+                  seat_code), or None if the seat is missing or taken
+        """
+        def book(conn):
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+
+            # Claim the seat only if it is still available
+            cursor.execute(
+                'UPDATE seats SET is_available = 0 WHERE id = ? AND is_available = 1',
+                (seat_id,)
+            )
+            if cursor.rowcount != 1:
+                conn.rollback()
                 return None
 
             # Create booking
@@ -173,50 +702,112 @@ class Database:
                 INSERT INTO bookings (seat_id, user_name, user_email, booking_date)
                 VALUES (?, ?, ?, ?)
             ''', (seat_id, user_name, user_email, booking_date))
+            booking_id = cursor.lastrowid
+
+            # Snapshot the seat from the same transaction
+            cursor.execute(
+                f'SELECT {self.SEAT_SNAPSHOT_COLUMNS} FROM seats WHERE id = ?',
+                (seat_id,)
+            )
+            seat = dict(cursor.fetchone())
 
-            # Mark seat as unavailable
-            cursor.execute('UPDATE seats SET is_available = 0 WHERE id = ?', (seat_id,))
+            revision = self._bump_revision(cursor, [seat_id])
 
             conn.commit()
-            booking_id = cursor.lastrowid
-            conn.close()
-            return booking_id
+            self.seat_cache.apply(
+                [seat_id], revision,
+                is_available=0, user_name=user_name, user_email=user_email
+            )
+            return self._booking_record(booking_id, seat, user_name, user_email, booking_date)
 
-        except Exception as e:
-            conn.rollback()
-            conn.close()
-            raise e
+        return self._run_write(book)
+
+    def create_group_booking(self, seat_ids, user_name, user_email):
+        """
+        Book several seats all-or-nothing in one transaction
+
+        Args:
+            seat_ids: List of seat IDs to book
+            user_name: Booker's name
+            user_email: Booker's email
+
+        Returns:
+            list: Booking records in the order of seat_ids, or None if any
+                  seat is missing or already booked
+        """
+        seat_ids = list(dict.fromkeys(seat_ids))
+
+        def book(conn):
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+
+            # Claim every seat; rowcount sums across executemany
+            cursor.executemany(
+                'UPDATE seats SET is_available = 0 WHERE id = ? AND is_available = 1',
+                [(seat_id,) for seat_id in seat_ids]
+            )
+            if cursor.rowcount != len(seat_ids):
+                conn.rollback()
+                return None
+
+            booking_date = datetime.now().isoformat()
+            booking_ids = {}
+            for seat_id in seat_ids:
+                cursor.execute('''
+                    INSERT INTO bookings (seat_id, user_name, user_email, booking_date)
+                    VALUES (?, ?, ?, ?)
+                ''', (seat_id, user_name, user_email, booking_date))
+                booking_ids[seat_id] = cursor.lastrowid
+
+            placeholders = ','.join('?' * len(seat_ids))
+            cursor.execute(
+                f'SELECT {self.SEAT_SNAPSHOT_COLUMNS} FROM seats WHERE id IN ({placeholders})',
+                seat_ids
+            )
+            seats = {row['id']: dict(row) for row in cursor.fetchall()}
+
+            revision = self._bump_revision(cursor, seat_ids)
+
+            conn.commit()
+            self.seat_cache.apply(
+                seat_ids, revision,
+                is_available=0, user_name=user_name, user_email=user_email
+            )
+            return [
+                self._booking_record(booking_ids[seat_id], seats[seat_id], user_name, user_email, booking_date)
+                for seat_id in seat_ids
+            ]
+
+        return self._run_write(book)
 
     def get_all_bookings(self):
         """Get all bookings"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            SELECT b.id, b.seat_id, b.user_name, b.user_email,
-                   b.booking_date, b.payment_status,
-                   s.layer, s.side, s.position, s.price
-            FROM bookings b
-            JOIN seats s ON b.seat_id = s.id
-            ORDER BY b.booking_date DESC
-        ''')
+            cursor.execute('''
+                SELECT b.id, b.seat_id, b.user_name, b.user_email,
+                       b.booking_date, b.payment_status,
+                       s.layer, s.side, s.position, s.price
+                FROM bookings b
+                JOIN seats s ON b.seat_id = s.id
+                ORDER BY b.booking_date DESC
+            ''')
 
-        bookings = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return bookings
+            return [dict(row) for row in cursor.fetchall()]
 
     def cancel_booking(self, booking_id):
         """Cancel a booking and free up the seat"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        def cancel(conn):
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
 
-        try:
             # Get seat_id from booking
             cursor.execute('SELECT seat_id FROM bookings WHERE id = ?', (booking_id,))
             booking = cursor.fetchone()
 
             if not booking:
-                conn.close()
+                conn.rollback()
                 return False
 
             seat_id = booking['seat_id']
@@ -227,11 +818,13 @@ class Database:
             # Mark seat as available
             cursor.execute('UPDATE seats SET is_available = 1 WHERE id = ?', (seat_id,))
 
+            revision = self._bump_revision(cursor, [seat_id])
+
             conn.commit()
-            conn.close()
+            self.seat_cache.apply(
+                [seat_id], revision,
+                is_available=1, user_name=None, user_email=None
+            )
             return True
 
-        except Exception as e:
-            conn.rollback()
-            conn.close()
-            raise e
+        return self._run_write(cancel)
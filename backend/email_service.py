@@ -1,6 +1,12 @@
 from flask_mail import Mail, Message
+from email_templates import render_confirmation, render_group_confirmation
 import os
+import atexit
 import logging
+import queue
+import smtplib
+import threading
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -8,6 +14,12 @@ logger = logging.getLogger(__name__)
 
 mail = Mail()
 
+# Background dispatcher, created by init_mail
+dispatcher = None
+
+# Shared session for send_bulk, created by init_mail
+bulk_session = None
+
 def init_mail(app):
     """Initialize Flask-Mail with app configuration"""
     app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER', 'smtp-mail.outlook.com')
@@ -19,252 +31,465 @@ def init_mail(app):
     app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER')
 
     mail.init_app(app)
+
+    global dispatcher
+    dispatcher = EmailDispatcher(
+        app,
+        workers=int(os.getenv('EMAIL_WORKERS', 2)),
+        queue_size=int(os.getenv('EMAIL_QUEUE_SIZE', 500)),
+        max_retries=int(os.getenv('EMAIL_MAX_RETRIES', 3)),
+        retry_backoff=float(os.getenv('EMAIL_RETRY_BACKOFF', 1.0)),
+        smtp_idle_timeout=float(os.getenv('SMTP_IDLE_TIMEOUT', 30))
+    )
+    atexit.register(dispatcher.shutdown)
+
+    global bulk_session
+    bulk_session = SMTPSession(idle_timeout=float(os.getenv('SMTP_IDLE_TIMEOUT', 30)))
+    atexit.register(bulk_session.close)
+
     logger.info("Email service initialized")
 
 def create_confirmation_email_body(booking_data):
-    """Create HTML email body for booking confirmation"""
-    seat_info = booking_data.get('seat_info', {})
-
-    # Get seat ID
-    seat_id = seat_info.get('seat_id', 'N/A')
-
-    # Format seat location
-    if seat_info.get('side'):
-        seat_location = f"Layer {seat_info['layer']} - {seat_info['side'].capitalize()} Side - Position {seat_info['position']}"
-    else:
-        seat_location = f"Layer {seat_info['layer']} - Position {seat_info['position']}"
-
-    # Determine seat type description
-    seat_type = seat_info.get('seat_type', 'regular')
-    type_descriptions = {
-        'regular_top': 'Regular Top Section',
-        'perpendicular_front': 'Premium Perpendicular Front Section',
-        'regular_bottom': 'Regular Bottom Section',
-        'regular': 'Regular Section'
-    }
-    seat_type_desc = type_descriptions.get(seat_type, 'Regular Section')
-
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                line-height: 1.6;
-                color: #333;
-                max-width: 600px;
-                margin: 0 auto;
-                padding: 20px;
-            }}
-            .header {{
-                background-color: #4CAF50;
-                color: white;
-                padding: 20px;
-                text-align: center;
-                border-radius: 5px 5px 0 0;
-            }}
-            .content {{
-                background-color: #f9f9f9;
-                padding: 20px;
-                border: 1px solid #ddd;
-                border-radius: 0 0 5px 5px;
-            }}
-            .booking-details {{
-                background-color: white;
-                padding: 15px;
-                margin: 15px 0;
-                border-left: 4px solid #4CAF50;
-            }}
-            .detail-row {{
-                margin: 10px 0;
-            }}
-            .label {{
-                font-weight: bold;
-                color: #555;
-            }}
-            .value {{
-                color: #333;
-            }}
-            .price {{
-                font-size: 24px;
-                color: #4CAF50;
-                font-weight: bold;
-            }}
-            .footer {{
-                margin-top: 20px;
-                padding-top: 20px;
-                border-top: 1px solid #ddd;
-                font-size: 12px;
-                color: #777;
-                text-align: center;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>🎉 Booking Confirmation</h1>
-        </div>
-        <div class="content">
-            <p>Dear {booking_data['user_name']},</p>
-            <p>Thank you for your booking! We're excited to confirm your annual seat reservation.</p>
-
-            <div class="booking-details">
-                <h2>Booking Details</h2>
-
-                <div class="detail-row">
-                    <span class="label">Booking ID:</span>
-                    <span class="value">#{booking_data['booking_id']}</span>
-                </div>
-
-                <div class="detail-row">
-                    <span class="label">Seat ID:</span>
-                    <span class="value" style="font-weight: bold; color: #667eea; font-size: 1.2em;">{seat_id}</span>
-                </div>
-
-                <div class="detail-row">
-                    <span class="label">Seat Location:</span>
-                    <span class="value">{seat_location}</span>
-                </div>
-
-                <div class="detail-row">
-                    <span class="label">Seat Type:</span>
-                    <span class="value">{seat_type_desc}</span>
-                </div>
-
-                <div class="detail-row">
-                    <span class="label">Annual Price:</span>
-                    <span class="price">${seat_info['price']}</span>
-                </div>
-
-                <div class="detail-row">
-                    <span class="label">Customer Name:</span>
-                    <span class="value">{booking_data['user_name']}</span>
-                </div>
-
-                <div class="detail-row">
-                    <span class="label">Email:</span>
-                    <span class="value">{booking_data['user_email']}</span>
-                </div>
-
-                <div class="detail-row">
-                    <span class="label">Booking Date:</span>
-                    <span class="value">{booking_data['booking_date']}</span>
-                </div>
-            </div>
-
-            <p><strong>What's Next?</strong></p>
-            <ul>
-                <li>Your seat is now reserved for the year</li>
-                <li>Payment status: Pending</li>
-                <li>You will receive payment instructions separately</li>
-            </ul>
-
-            <p>If you have any questions or need to make changes to your booking, please contact us.</p>
-
-            <p>Thank you for choosing our service!</p>
-
-            <div class="footer">
-                <p>This is an automated confirmation email.</p>
-                <p>© 2024 Annual Seat Booking System. All rights reserved.</p>
-            </div>
-        </div>
-    </body>
-    </html>
+    """Create HTML and text email bodies for booking confirmation"""
+    return render_confirmation(booking_data)
+
+def _log_email_error(booking_id, recipient, error, error_msg):
+    """Append an email failure to erroremail.md"""
+    try:
+        from datetime import datetime
+        error_log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'erroremail.md')
+
+        with open(error_log_path, 'a') as f:
+            f.write(f"\n## Email Error - {datetime.now().isoformat()}\n\n")
+            f.write(f"**Booking ID:** {booking_id}\n\n")
+            f.write(f"**Recipient:** {recipient}\n\n")
+            f.write(f"**Error:** {str(error)}\n\n")
+            f.write(f"**Full Details:**\n```\n{error_msg}\n```\n\n")
+            f.write("---\n")
+    except Exception as log_error:
+        logger.error(f"Failed to write error log: {str(log_error)}")
+
+def build_booking_confirmation_message(booking_data):
     """
+    Build the booking confirmation message
 
-    # Plain text version
-    text = f"""
-    Booking Confirmation
+    Must be called inside a Flask app context.
 
-    Dear {booking_data['user_name']},
+    Args:
+        booking_data: Dictionary containing:
+            - booking_id: Booking ID
+            - user_name: Customer name
+            - user_email: Customer email
+            - booking_date: Booking date
+            - seat_info: Dictionary with seat details (layer, side, position, price, seat_type)
 
-    Thank you for your booking! We're excited to confirm your annual seat reservation.
+    Returns:
+        Message: Ready-to-send Flask-Mail message
+    """
+    # Validate required fields
+    required_fields = ['booking_id', 'user_name', 'user_email', 'booking_date', 'seat_info']
+    for field in required_fields:
+        if field not in booking_data:
+            raise ValueError(f"Missing required field: {field}")
 
-    BOOKING DETAILS:
-    ----------------
-    Booking ID: #{booking_data['booking_id']}
-    Seat Location: {seat_location}
-    Seat Type: {seat_type_desc}
-    Annual Price: ${seat_info['price']}
-    Customer Name: {booking_data['user_name']}
-    Email: {booking_data['user_email']}
-    Booking Date: {booking_data['booking_date']}
+    # Create email message
+    subject = f"Booking Confirmation - Seat #{booking_data['booking_id']}"
 
-    WHAT'S NEXT:
-    - Your seat is now reserved for the year
-    - Payment status: Pending
-    - You will receive payment instructions separately
+    html_body, text_body = create_confirmation_email_body(booking_data)
 
-    If you have any questions or need to make changes to your booking, please contact us.
+    return Message(
+        subject=subject,
+        recipients=[booking_data['user_email']],
+        body=text_body,
+        html=html_body
+    )
 
-    Thank you for choosing our service!
+def send_booking_confirmation(booking_data):
+    """
+    Send booking confirmation email synchronously
+
+    Args:
+        booking_data: See build_booking_confirmation_message
 
-    ---
-    This is an automated confirmation email.
-    © 2024 Annual Seat Booking System. All rights reserved.
+    Returns:
+        tuple: (success: bool, message: str)
     """
+    try:
+        msg = build_booking_confirmation_message(booking_data)
 
-    return html, text
+        # Send email
+        mail.send(msg)
 
-def send_booking_confirmation(booking_data):
+        logger.info(f"Confirmation email sent successfully to {booking_data['user_email']} for booking #{booking_data['booking_id']}")
+        return True, "Email sent successfully"
+
+    except Exception as e:
+        error_msg = f"Failed to send confirmation email: {str(e)}"
+        logger.error(error_msg)
+
+        _log_email_error(booking_data.get('booking_id', 'N/A'), booking_data.get('user_email', 'N/A'), e, error_msg)
+
+        return False, error_msg
+
+def create_group_confirmation_email_body(booking_data):
+    """Create HTML and text email bodies for a multi-seat booking"""
+    return render_group_confirmation(booking_data)
+
+def build_group_booking_confirmation_message(booking_data):
     """
-    Send booking confirmation email
+    Build one combined confirmation message for a multi-seat booking
+
+    Must be called inside a Flask app context.
 
     Args:
         booking_data: Dictionary containing:
-            - booking_id: Booking ID
             - user_name: Customer name
             - user_email: Customer email
             - booking_date: Booking date
-            - seat_info: Dictionary with seat details (layer, side, position, price, seat_type)
+            - seats: List of seat dictionaries (booking_id, seat_id, layer,
+                     side, position, price, seat_type)
 
     Returns:
-        tuple: (success: bool, message: str)
+        Message: Ready-to-send Flask-Mail message
     """
-    try:
-        # Validate required fields
-        required_fields = ['booking_id', 'user_name', 'user_email', 'booking_date', 'seat_info']
-        for field in required_fields:
-            if field not in booking_data:
-                raise ValueError(f"Missing required field: {field}")
+    # Validate required fields
+    required_fields = ['user_name', 'user_email', 'booking_date', 'seats']
+    for field in required_fields:
+        if field not in booking_data:
+            raise ValueError(f"Missing required field: {field}")
 
-        # Create email message
-        subject = f"Booking Confirmation - Seat #{booking_data['booking_id']}"
+    subject = f"Booking Confirmation - {len(booking_data['seats'])} Seats"
 
-        html_body, text_body = create_confirmation_email_body(booking_data)
+    html_body, text_body = create_group_confirmation_email_body(booking_data)
 
-        msg = Message(
-            subject=subject,
-            recipients=[booking_data['user_email']],
-            body=text_body,
-            html=html_body
-        )
+    return Message(
+        subject=subject,
+        recipients=[booking_data['user_email']],
+        body=text_body,
+        html=html_body
+    )
+
+def _group_booking_reference(booking_data):
+    """Comma-separated booking IDs of a group booking"""
+    return ', '.join(str(seat.get('booking_id')) for seat in booking_data.get('seats', []))
+
+def send_group_booking_confirmation(booking_data):
+    """
+    Send one combined confirmation email for a multi-seat booking synchronously
+
+    Args:
+        booking_data: See build_group_booking_confirmation_message
+
+    Returns:
+        tuple: (success: bool, message: str)
+    """
+    try:
+        msg = build_group_booking_confirmation_message(booking_data)
 
-        # Send email
         mail.send(msg)
 
-        logger.info(f"Confirmation email sent successfully to {booking_data['user_email']} for booking #{booking_data['booking_id']}")
+        logger.info(f"Group confirmation email sent successfully to {booking_data['user_email']} for bookings {_group_booking_reference(booking_data)}")
         return True, "Email sent successfully"
 
     except Exception as e:
-        error_msg = f"Failed to send confirmation email: {str(e)}"
+        error_msg = f"Failed to send group confirmation email: {str(e)}"
         logger.error(error_msg)
 
-        # Log error to file
-        try:
-            import os
-            from datetime import datetime
-            error_log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'erroremail.md')
-
-            with open(error_log_path, 'a') as f:
-                f.write(f"\n## Email Error - {datetime.now().isoformat()}\n\n")
-                f.write(f"**Booking ID:** {booking_data.get('booking_id', 'N/A')}\n\n")
-                f.write(f"**Recipient:** {booking_data.get('user_email', 'N/A')}\n\n")
-                f.write(f"**Error:** {str(e)}\n\n")
-                f.write(f"**Full Details:**\n```\n{error_msg}\n```\n\n")
-                f.write("---\n")
-        except Exception as log_error:
-            logger.error(f"Failed to write error log: {str(log_error)}")
+        _log_email_error(_group_booking_reference(booking_data), booking_data.get('user_email', 'N/A'), e, error_msg)
 
         return False, error_msg
+
+class SMTPSession:
+    """Long-lived authenticated SMTP connection built on Flask-Mail's connect()"""
+
+    # Errors after which the connection is assumed dead and reopened once
+    RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+    def __init__(self, idle_timeout=30):
+        """
+        Initialize SMTP session; the connection is opened lazily
+
+        Args:
+            idle_timeout: Reconnect before sending if the connection has been
+                          idle this many seconds (servers drop idle sessions)
+        """
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._connection = None
+        self._last_used = 0.0
+        self._stats = {'connects': 0, 'reconnects': 0, 'messages': 0}
+
+    def _open(self):
+        # Connection.__enter__ performs the connect, STARTTLS and login
+        self._connection = mail.connect().__enter__()
+        self._stats['connects'] += 1
+
+    def _close(self):
+        if self._connection is None:
+            return
+        try:
+            self._connection.__exit__(None, None, None)
+        except Exception:
+            pass
+        self._connection = None
+
+    def _send_locked(self, message):
+        if self._connection is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self._close()
+        if self._connection is None:
+            self._open()
+
+        try:
+            self._connection.send(message)
+        except self.RECONNECT_ERRORS:
+            # The server dropped us; retry once on a fresh connection
+            self._close()
+            self._open()
+            self._stats['reconnects'] += 1
+            self._connection.send(message)
+
+        self._last_used = time.monotonic()
+        self._stats['messages'] += 1
+
+    def send(self, message):
+        """
+        Send one message over the shared connection
+
+        Must be called inside a Flask app context.
+        """
+        with self._lock:
+            try:
+                self._send_locked(message)
+            except Exception:
+                self._close()
+                raise
+
+    def send_bulk(self, messages):
+        """
+        Send many messages over one authenticated session
+
+        Must be called inside a Flask app context.
+
+        Args:
+            messages: Iterable of Flask-Mail messages
+
+        Returns:
+            tuple: (sent: int, failures: list of (message, exception))
+        """
+        sent = 0
+        failures = []
+        with self._lock:
+            for message in messages:
+                try:
+                    self._send_locked(message)
+                    sent += 1
+                except Exception as e:
+                    self._close()
+                    failures.append((message, e))
+        return sent, failures
+
+    def close(self):
+        """Quit the SMTP connection if open"""
+        with self._lock:
+            self._close()
+
+    def get_stats(self):
+        """Get connect/reconnect/message counters"""
+        with self._lock:
+            return dict(self._stats)
+
+def send_bulk(messages):
+    """
+    Send many messages over one pooled SMTP session
+
+    Must be called inside a Flask app context.
+
+    Returns:
+        tuple: (sent: int, failures: list of (message, exception))
+    """
+    return bulk_session.send_bulk(messages)
+
+class EmailDispatcher:
+    """Bounded in-process queue that sends emails on background worker threads"""
+
+    def __init__(self, app, workers=2, queue_size=500, max_retries=3, retry_backoff=1.0,
+                 smtp_idle_timeout=30):
+        """
+        Initialize dispatcher and start its workers
+
+        Args:
+            app: Flask app whose context is used for building and sending
+            workers: Number of worker threads
+            queue_size: Maximum number of pending emails
+            max_retries: Retries per email after the first failed attempt
+            retry_backoff: Base delay in seconds, doubled on every retry
+            smtp_idle_timeout: Idle seconds before a worker's SMTP session
+                               is reopened
+        """
+        self.app = app
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        # Serializes enqueueing with shutdown so no job lands behind the stop sentinels
+        self._accept_lock = threading.Lock()
+        self._accepting = True
+        self._in_flight = 0
+        self._stats = {'enqueued': 0, 'sent': 0, 'failed': 0, 'retries': 0, 'rejected': 0}
+        # One long-lived SMTP session per worker; smtplib is not thread-safe
+        self._sessions = [SMTPSession(idle_timeout=smtp_idle_timeout) for _ in range(workers)]
+        self._workers = [
+            threading.Thread(target=self._run, args=(session,), name=f'email-worker-{i}', daemon=True)
+            for i, session in enumerate(self._sessions)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def submit(self, build_message, booking_data, reference):
+        """
+        Queue an email for background delivery
+
+        Args:
+            build_message: Callable turning booking_data into a Message
+            booking_data: Booking payload (must include user_email)
+            reference: Booking reference used in logs
+
+        Returns:
+            tuple: (status: 'queued' | 'rejected', message: str)
+        """
+        with self._accept_lock:
+            if not self._accepting:
+                self._count('rejected')
+                return 'rejected', 'Email service is shutting down'
+
+            try:
+                self._queue.put_nowait((build_message, booking_data, reference))
+            except queue.Full:
+                self._count('rejected')
+                logger.error(f"Email queue full, dropping confirmation for booking {reference}")
+                return 'rejected', 'Email queue is full'
+
+        self._count('enqueued')
+        return 'queued', 'Confirmation email queued for delivery'
+
+    def _run(self, session):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    session.close()
+                    return
+                with self._lock:
+                    self._in_flight += 1
+                self._deliver(session, *job)
+            finally:
+                if job is not None:
+                    with self._lock:
+                        self._in_flight -= 1
+                self._queue.task_done()
+
+    def _deliver(self, session, build_message, booking_data, reference):
+        recipient = booking_data.get('user_email', 'N/A')
+        attempt = 0
+
+        while True:
+            try:
+                with self.app.app_context():
+                    session.send(build_message(booking_data))
+                self._count('sent')
+                logger.info(f"Confirmation email sent successfully to {recipient} for booking {reference}")
+                return
+
+            except Exception as e:
+                # Malformed payloads will never succeed; don't retry them
+                if isinstance(e, ValueError) or attempt >= self.max_retries:
+                    self._count('failed')
+                    error_msg = f"Failed to send confirmation email after {attempt + 1} attempt(s): {str(e)}"
+                    logger.error(error_msg)
+                    _log_email_error(reference, recipient, e, error_msg)
+                    return
+
+                attempt += 1
+                self._count('retries')
+                time.sleep(self.retry_backoff * (2 ** (attempt - 1)))
+
+    def get_stats(self):
+        """
+        Get queue metrics
+
+        Returns:
+            dict: Queue depth, in-flight sends and delivery counters
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = self._in_flight
+
+        stats['queue_depth'] = self._queue.qsize()
+        stats['queue_capacity'] = self._queue.maxsize
+        stats['workers'] = len(self._workers)
+        stats['smtp_connects'] = sum(session.get_stats()['connects'] for session in self._sessions)
+        stats['accepting'] = self._accepting
+        return stats
+
+    def shutdown(self, timeout=30):
+        """
+        Stop accepting emails and drain the queue
+
+        Args:
+            timeout: Maximum seconds to wait for pending emails
+
+        Returns:
+            bool: True if every worker finished within the timeout
+        """
+        # Every job accepted before this point is queued ahead of the sentinels
+        with self._accept_lock:
+            self._accepting = False
+        deadline = time.monotonic() + timeout
+
+        for _ in self._workers:
+            try:
+                self._queue.put(None, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                break
+
+        for worker in self._workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+
+        drained = not any(worker.is_alive() for worker in self._workers)
+        if not drained:
+            logger.warning(f"Email queue not drained on shutdown, {self._queue.qsize()} email(s) pending")
+        return drained
+
+def queue_booking_confirmation(booking_data):
+    """
+    Queue a booking confirmation for background delivery
+
+    Returns:
+        tuple: (status: 'queued' | 'rejected', message: str)
+    """
+    return dispatcher.submit(
+        build_booking_confirmation_message,
+        booking_data,
+        f"#{booking_data.get('booking_id', 'N/A')}"
+    )
+
+def queue_group_booking_confirmation(booking_data):
+    """
+    Queue a combined group booking confirmation for background delivery
+
+    Returns:
+        tuple: (status: 'queued' | 'rejected', message: str)
+    """
+    return dispatcher.submit(
+        build_group_booking_confirmation_message,
+        booking_data,
+        _group_booking_reference(booking_data)
+    )
+
+def get_email_queue_stats():
+    """Get email dispatch queue metrics"""
+    return dispatcher.get_stats()
@@ -0,0 +1,388 @@
+"""
+Email Template Layer
+Confirmation email templates compiled once at import; rendering only fills in the variable parts
+"""
+
+import string
+
+
+# Shared stylesheet for confirmation emails
+EMAIL_STYLE = """            body {
+                font-family: Arial, sans-serif;
+                line-height: 1.6;
+                color: #333;
+                max-width: 600px;
+                margin: 0 auto;
+                padding: 20px;
+            }
+            .header {
+                background-color: #4CAF50;
+                color: white;
+                padding: 20px;
+                text-align: center;
+                border-radius: 5px 5px 0 0;
+            }
+            .content {
+                background-color: #f9f9f9;
+                padding: 20px;
+                border: 1px solid #ddd;
+                border-radius: 0 0 5px 5px;
+            }
+            .booking-details {
+                background-color: white;
+                padding: 15px;
+                margin: 15px 0;
+                border-left: 4px solid #4CAF50;
+            }
+            .detail-row {
+                margin: 10px 0;
+            }
+            .label {
+                font-weight: bold;
+                color: #555;
+            }
+            .value {
+                color: #333;
+            }
+            .price {
+                font-size: 24px;
+                color: #4CAF50;
+                font-weight: bold;
+            }
+            .footer {
+                margin-top: 20px;
+                padding-top: 20px;
+                border-top: 1px solid #ddd;
+                font-size: 12px;
+                color: #777;
+                text-align: center;
+            }"""
+
+SEAT_TYPE_DESCRIPTIONS = {
+    'regular_top': 'Regular Top Section',
+    'perpendicular_front': 'Premium Perpendicular Front Section',
+    'regular_bottom': 'Regular Bottom Section',
+    'regular': 'Regular Section'
+}
+
+
+class EmailTemplate:
+    """Template compiled into static fragments interleaved with named slots"""
+
+    def __init__(self, source, **static):
+        """
+        Compile a template
+
+        Args:
+            source: Template text with str.format-style {name} slots
+            **static: Slot values known at compile time (e.g. the stylesheet);
+                      they are folded into the static fragments
+        """
+        fragments = []
+        fields = []
+        literal = []
+
+        for text, field, _, _ in string.Formatter().parse(source):
+            literal.append(text)
+            if field is None:
+                continue
+            if field in static:
+                literal.append(str(static[field]))
+                continue
+            fragments.append(''.join(literal))
+            fields.append(field)
+            literal = []
+
+        self._head = fragments[0] if fragments else ''.join(literal)
+        self._pairs = tuple(zip(fields, fragments[1:] + [''.join(literal)])) if fields else ()
+        self.fields = frozenset(fields)
+
+    def render(self, values):
+        """
+        Fill the slots and join with the precompiled fragments
+
+        Args:
+            values: Dict with a value for every slot
+        """
+        parts = [self._head]
+        for field, fragment in self._pairs:
+            parts.append(str(values[field]))
+            parts.append(fragment)
+        return ''.join(parts)
+
+
+def format_seat_location(seat_info):
+    """Format a human-readable seat location"""
+    if seat_info.get('side'):
+        return f"Layer {seat_info['layer']} - {seat_info['side'].capitalize()} Side - Position {seat_info['position']}"
+    return f"Layer {seat_info['layer']} - Position {seat_info['position']}"
+
+
+def describe_seat_type(seat_type):
+    """Get the display description for a seat type"""
+    return SEAT_TYPE_DESCRIPTIONS.get(seat_type, 'Regular Section')
+
+
+CONFIRMATION_HTML = EmailTemplate("""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <style>
+{style}
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>🎉 Booking Confirmation</h1>
+        </div>
+        <div class="content">
+            <p>Dear {user_name},</p>
+            <p>Thank you for your booking! We're excited to confirm your annual seat reservation.</p>
+
+            <div class="booking-details">
+                <h2>Booking Details</h2>
+
+                <div class="detail-row">
+                    <span class="label">Booking ID:</span>
+                    <span class="value">#{booking_id}</span>
+                </div>
+
+                <div class="detail-row">
+                    <span class="label">Seat ID:</span>
+                    <span class="value" style="font-weight: bold; color: #667eea; font-size: 1.2em;">{seat_id}</span>
+                </div>
+
+                <div class="detail-row">
+                    <span class="label">Seat Location:</span>
+                    <span class="value">{seat_location}</span>
+                </div>
+
+                <div class="detail-row">
+                    <span class="label">Seat Type:</span>
+                    <span class="value">{seat_type_desc}</span>
+                </div>
+
+                <div class="detail-row">
+                    <span class="label">Annual Price:</span>
+                    <span class="price">${price}</span>
+                </div>
+
+                <div class="detail-row">
+                    <span class="label">Customer Name:</span>
+                    <span class="value">{user_name}</span>
+                </div>
+
+                <div class="detail-row">
+                    <span class="label">Email:</span>
+                    <span class="value">{user_email}</span>
+                </div>
+
+                <div class="detail-row">
+                    <span class="label">Booking Date:</span>
+                    <span class="value">{booking_date}</span>
+                </div>
+            </div>
+
+            <p><strong>What's Next?</strong></p>
+            <ul>
+                <li>Your seat is now reserved for the year</li>
+                <li>Payment status: Pending</li>
+                <li>You will receive payment instructions separately</li>
+            </ul>
+
+            <p>If you have any questions or need to make changes to your booking, please contact us.</p>
+
+            <p>Thank you for choosing our service!</p>
+
+            <div class="footer">
+                <p>This is an automated confirmation email.</p>
+                <p>© 2024 Annual Seat Booking System. All rights reserved.</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """, style=EMAIL_STYLE)
+
+CONFIRMATION_TEXT = EmailTemplate("""
+    Booking Confirmation
+
+    Dear {user_name},
+
+    Thank you for your booking! We're excited to confirm your annual seat reservation.
+
+    BOOKING DETAILS:
+    ----------------
+    Booking ID: #{booking_id}
+    Seat Location: {seat_location}
+    Seat Type: {seat_type_desc}
+    Annual Price: ${price}
+    Customer Name: {user_name}
+    Email: {user_email}
+    Booking Date: {booking_date}
+
+    WHAT'S NEXT:
+    - Your seat is now reserved for the year
+    - Payment status: Pending
+    - You will receive payment instructions separately
+
+    If you have any questions or need to make changes to your booking, please contact us.
+
+    Thank you for choosing our service!
+
+    ---
+    This is an automated confirmation email.
+    © 2024 Annual Seat Booking System. All rights reserved.
+    """)
+
+GROUP_SEAT_ROW_HTML = EmailTemplate("""
+                <div class="detail-row">
+                    <span class="label">{seat_id} (Booking #{booking_id}):</span>
+                    <span class="value">{seat_location} - {seat_type_desc} - ${price}</span>
+                </div>""")
+
+GROUP_SEAT_LINE_TEXT = EmailTemplate(
+    "    - {seat_id} (Booking #{booking_id}): {seat_location}, {seat_type_desc}, ${price}"
+)
+
+GROUP_CONFIRMATION_HTML = EmailTemplate("""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <style>
+{style}
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>🎉 Group Booking Confirmation</h1>
+        </div>
+        <div class="content">
+            <p>Dear {user_name},</p>
+            <p>Thank you for your booking! We're excited to confirm your annual reservation for {seat_count} seats.</p>
+
+            <div class="booking-details">
+                <h2>Booking Details</h2>
+{seat_rows}
+
+                <div class="detail-row">
+                    <span class="label">Total Annual Price:</span>
+                    <span class="price">${total_price}</span>
+                </div>
+
+                <div class="detail-row">
+                    <span class="label">Customer Name:</span>
+                    <span class="value">{user_name}</span>
+                </div>
+
+                <div class="detail-row">
+                    <span class="label">Email:</span>
+                    <span class="value">{user_email}</span>
+                </div>
+
+                <div class="detail-row">
+                    <span class="label">Booking Date:</span>
+                    <span class="value">{booking_date}</span>
+                </div>
+            </div>
+
+            <p><strong>What's Next?</strong></p>
+            <ul>
+                <li>Your seats are now reserved for the year</li>
+                <li>Payment status: Pending</li>
+                <li>You will receive payment instructions separately</li>
+            </ul>
+
+            <p>If you have any questions or need to make changes to your booking, please contact us.</p>
+
+            <p>Thank you for choosing our service!</p>
+
+            <div class="footer">
+                <p>This is an automated confirmation email.</p>
+                <p>© 2024 Annual Seat Booking System. All rights reserved.</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """, style=EMAIL_STYLE)
+
+GROUP_CONFIRMATION_TEXT = EmailTemplate("""
+    Group Booking Confirmation
+
+    Dear {user_name},
+
+    Thank you for your booking! We're excited to confirm your annual reservation for {seat_count} seats.
+
+    BOOKING DETAILS:
+    ----------------
+{seat_lines}
+    Booking IDs: {booking_refs}
+    Total Annual Price: ${total_price}
+    Customer Name: {user_name}
+    Email: {user_email}
+    Booking Date: {booking_date}
+
+    WHAT'S NEXT:
+    - Your seats are now reserved for the year
+    - Payment status: Pending
+    - You will receive payment instructions separately
+
+    If you have any questions or need to make changes to your booking, please contact us.
+
+    Thank you for choosing our service!
+
+    ---
+    This is an automated confirmation email.
+    © 2024 Annual Seat Booking System. All rights reserved.
+    """)
+
+
+def render_confirmation(booking_data):
+    """
+    Render the booking confirmation
+
+    Returns:
+        tuple: (html, text)
+    """
+    seat_info = booking_data.get('seat_info', {})
+    values = {
+        'booking_id': booking_data['booking_id'],
+        'user_name': booking_data['user_name'],
+        'user_email': booking_data['user_email'],
+        'booking_date': booking_data['booking_date'],
+        'seat_id': seat_info.get('seat_id', 'N/A'),
+        'seat_location': format_seat_location(seat_info),
+        'seat_type_desc': describe_seat_type(seat_info.get('seat_type', 'regular')),
+        'price': seat_info['price']
+    }
+    return CONFIRMATION_HTML.render(values), CONFIRMATION_TEXT.render(values)
+
+
+def render_group_confirmation(booking_data):
+    """
+    Render the combined confirmation for a multi-seat booking
+
+    Returns:
+        tuple: (html, text)
+    """
+    seats = booking_data.get('seats', [])
+    seat_values = [
+        {
+            'seat_id': seat.get('seat_id', 'N/A'),
+            'booking_id': seat['booking_id'],
+            'seat_location': format_seat_location(seat),
+            'seat_type_desc': describe_seat_type(seat.get('seat_type', 'regular')),
+            'price': seat['price']
+        }
+        for seat in seats
+    ]
+    values = {
+        'user_name': booking_data['user_name'],
+        'user_email': booking_data['user_email'],
+        'booking_date': booking_data['booking_date'],
+        'seat_count': len(seats),
+        'total_price': sum(seat['price'] for seat in seats),
+        'booking_refs': ', '.join(f"#{seat['booking_id']}" for seat in seats),
+        'seat_rows': "\n".join(GROUP_SEAT_ROW_HTML.render(v) for v in seat_values),
+        'seat_lines': "\n".join(GROUP_SEAT_LINE_TEXT.render(v) for v in seat_values)
+    }
+    return GROUP_CONFIRMATION_HTML.render(values), GROUP_CONFIRMATION_TEXT.render(values)
@@ -0,0 +1,187 @@
+"""
+In-process Metrics
+Thread-safe counters and fixed-bucket histograms, exported as JSON or
+Prometheus text format
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+
+# Bucket upper bounds for latencies in seconds and token counts
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 13.0, 21.0, 30.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 768, 1024, 1536, 2048, 3072, 4096, 8192)
+
+
+def escape_label_value(value) -> str:
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+    """Cumulative-bucket histogram with count, sum and bucket-interpolated quantiles"""
+
+    def __init__(self, buckets):
+        """
+        Initialize histogram
+
+        Args:
+            buckets: Ascending bucket upper bounds; an implicit +Inf bucket is added
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, n in enumerate(self.counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.max
+            if n and seen + n >= target:
+                return min(lower + (upper - lower) * (target - seen) / n, self.max)
+            seen += n
+            lower = upper
+        return self.max
+
+    def snapshot(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'avg': round(self.sum / self.count, 6) if self.count else 0.0,
+            'max': round(self.max, 6),
+            'p50': round(self.quantile(0.50), 6),
+            'p95': round(self.quantile(0.95), 6),
+            'p99': round(self.quantile(0.99), 6),
+            'buckets': {str(b): c for b, c in zip(list(self.buckets) + ['+Inf'], self._cumulative())}
+        }
+
+    def _cumulative(self):
+        total = 0
+        for n in self.counts:
+            total += n
+            yield total
+
+
+class MetricsRegistry:
+    """Named counters and histograms with optional labels"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict) -> Tuple:
+        return (name, tuple(sorted(labels.items())))
+
+    def describe(self, name: str, help_text: str):
+        """Attach a help string shown in the Prometheus export"""
+        self._help[name] = help_text
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        """Increment a counter"""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, buckets=LATENCY_BUCKETS, **labels):
+        """Record a histogram observation"""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def get_counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(self._key(name, labels), 0)
+
+    def snapshot(self) -> Dict:
+        """Get all metrics as a JSON-friendly dict"""
+        with self._lock:
+            return {
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(self._counters.items())
+                ],
+                'histograms': [
+                    {'name': name, 'labels': dict(labels), **histogram.snapshot()}
+                    for (name, labels), histogram in sorted(self._histograms.items())
+                ]
+            }
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        described = set()
+
+        def header(name, kind):
+            if name not in described:
+                described.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        def render_labels(labels, extra: Optional[Tuple] = None):
+            items = list(labels) + ([extra] if extra else [])
+            if not items:
+                return ''
+            return '{' + ','.join(f'{k}="{escape_label_value(v)}"' for k, v in items) + '}'
+
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                header(name, 'counter')
+                lines.append(f"{name}{render_labels(labels)} {value}")
+
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                header(name, 'histogram')
+                bounds = [str(b) for b in histogram.buckets] + ['+Inf']
+                for bound, total in zip(bounds, histogram._cumulative()):
+                    lines.append(f"{name}_bucket{render_labels(labels, ('le', bound))} {total}")
+                lines.append(f"{name}_sum{render_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{render_labels(labels)} {histogram.count}")
+
+        return '\n'.join(lines) + '\n'
+
+
+def render_gauges(prefix: str, stats: Dict) -> str:
+    """Render the numeric top-level values of a stats dict as Prometheus gauges"""
+    lines = []
+    for key, value in sorted(stats.items()):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            name = f"{prefix}_{key}"
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+# Process-wide registry shared by the chat services
+registry = MetricsRegistry()
+registry.describe('llm_call_seconds', 'Wall time of Azure OpenAI chat calls')
+registry.describe('llm_time_to_first_token_seconds', 'Time until the first streamed content token')
+registry.describe('llm_prompt_tokens', 'Prompt tokens per Azure OpenAI call')
+registry.describe('llm_completion_tokens', 'Completion tokens per Azure OpenAI call')
+registry.describe('llm_calls_total', 'Azure OpenAI chat calls by mode and outcome (ok, json_error, deadline, error)')
+registry.describe('llm_retries_total', 'Azure OpenAI attempts retried after a transient error')
+registry.describe('llm_json_decode_failures_total', 'Azure OpenAI replies that were not valid JSON')
+registry.describe('llm_cache_hits_total', 'Chat turns answered from the response cache')
+registry.describe('chat_route_total', 'Chat replies by path: keyword_fast_path, azure or keyword_fallback')
+registry.describe('nlp_fallback_errors_total', 'Keyword parser failures in the fallback path')
@@ -3,10 +3,100 @@ Enhanced NLP Processor with Azure OpenAI Integration
 Hybrid approach: Azure OpenAI (primary) + keyword-based NLP (fallback)
 """
 
-from azure_openai_service import AzureOpenAIService
+from azure_openai_service import AzureOpenAIService, AsyncAzureOpenAIService
 from nlp_processor import SeatAdvisorNLP
+from metrics import registry as metrics
+import copy
 import os
-from typing import Dict, List
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Iterator, Optional
+
+
+class CircuitBreaker:
+    """Trips Azure calls to the keyword fallback after repeated failures"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=3, reset_timeout=30):
+        """
+        Initialize circuit breaker
+
+        Args:
+            failure_threshold: Consecutive failures before the circuit opens
+            reset_timeout: Seconds the circuit stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trips = 0
+
+    def allow_request(self) -> bool:
+        """Check whether a call to Azure may be attempted now"""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                # Let exactly one trial call through
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        """Close the circuit after a successful call"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Count a failure, opening the circuit at the threshold"""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._trips += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def release_trial(self):
+        """Give up a half-open trial without a verdict, e.g. when the client went away"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def half_open(self):
+        """Allow a trial call early, e.g. after a successful health probe"""
+        with self._lock:
+            if self._state == self.OPEN:
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+
+    def get_status(self) -> Dict:
+        """Get circuit state and counters"""
+        with self._lock:
+            status = {
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout': self.reset_timeout,
+                'trips': self._trips
+            }
+            if self._state == self.OPEN:
+                status['retry_in'] = round(max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 1)
+            return status
 
 
 class AzureNLPProcessor:
@@ -17,71 +107,520 @@ class AzureNLPProcessor:
         self.azure_service = None
         self.fallback_nlp = SeatAdvisorNLP()
         self.use_azure = os.getenv('ENABLE_AZURE_OPENAI', 'false').lower() == 'true'
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv('AZURE_BREAKER_FAILURES', 3)),
+            reset_timeout=float(os.getenv('AZURE_BREAKER_RESET_SECONDS', 30))
+        )
+        self.probe_interval = float(os.getenv('AZURE_HEALTH_PROBE_INTERVAL', 60))
+        self._last_probe = None
+        self._stop_probe = threading.Event()
 
-        # Initialize Azure OpenAI if enabled
+        # Hedged mode: race Azure against a latency budget, keyword answer as backstop
+        self.latency_budget = float(os.getenv('LLM_LATENCY_BUDGET', 0))
+        self._hedge_executor = None
+        self._stats_lock = threading.Lock()
+        self._hedge_stats = {'requests': 0, 'within_budget': 0, 'budget_exceeded': 0, 'late_results': 0}
+
+        # Keyword fast path: answer clear messages without calling Azure
+        self.fast_path_confidence = float(os.getenv('KEYWORD_FAST_PATH_CONFIDENCE', 0.85))
+        self.fast_path_min_preferences = int(os.getenv('KEYWORD_FAST_PATH_MIN_PREFS', 3))
+        self._route_stats = {'keyword_fast_path': 0, 'azure': 0, 'keyword_fallback': 0}
+
+        # Initialize Azure OpenAI if enabled; one client is shared by all requests
         if self.use_azure:
             try:
-                self.azure_service = AzureOpenAIService()
-                # Test connection
-                if self.azure_service.test_connection():
-                    print("✅ Azure OpenAI connected successfully")
+                if os.getenv('AZURE_OPENAI_ASYNC', 'false').lower() == 'true':
+                    self.azure_service = AsyncAzureOpenAIService(
+                        max_concurrency=int(os.getenv('AZURE_OPENAI_MAX_CONCURRENCY', 16))
+                    )
+                    print("✅ Azure OpenAI async client initialized")
                 else:
-                    print("⚠️ Azure OpenAI connection failed, using fallback")
-                    self.use_azure = False
+                    self.azure_service = AzureOpenAIService()
+                    print("✅ Azure OpenAI client initialized")
             except Exception as e:
                 print(f"⚠️ Azure OpenAI initialization failed: {e}, using fallback")
                 self.use_azure = False
 
+        # The async client hands out futures itself and needs no worker threads
+        if self.use_azure and self.latency_budget > 0 and not isinstance(self.azure_service, AsyncAzureOpenAIService):
+            self._hedge_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv('LLM_HEDGE_WORKERS', 8)),
+                thread_name_prefix='azure-hedge'
+            )
+
+        # Check connectivity in the background instead of on the request path
+        if self.use_azure and self.probe_interval > 0:
+            threading.Thread(target=self._probe_loop, name='azure-health-probe', daemon=True).start()
+
+    def _probe_loop(self):
+        """Periodically test Azure and feed the result into the circuit breaker"""
+        while True:
+            healthy = self.azure_service.test_connection()
+            self._last_probe = {'healthy': healthy, 'checked_at': time.time()}
+
+            if healthy:
+                self.breaker.half_open()
+            else:
+                self.breaker.record_failure()
+
+            if self._stop_probe.wait(self.probe_interval):
+                return
+
+    def stop(self):
+        """Stop the background health probe and hedge workers"""
+        self._stop_probe.set()
+        if self._hedge_executor:
+            self._hedge_executor.shutdown(wait=False)
+        if isinstance(self.azure_service, AsyncAzureOpenAIService):
+            self.azure_service.close()
+
+    def get_status(self) -> Dict:
+        """
+        Get processor status for monitoring
+
+        Returns:
+            Dict with Azure availability, circuit breaker state and last probe
+        """
+        circuit = self.breaker.get_status()
+        azure_active = self.use_azure and self.azure_service is not None
+        return {
+            'azure_enabled': azure_active,
+            'mode': 'azure' if azure_active and circuit['state'] != CircuitBreaker.OPEN else 'fallback',
+            'circuit_breaker': circuit,
+            'health_probe': {
+                'interval_seconds': self.probe_interval,
+                'last_result': self._last_probe
+            },
+            'response_cache': self.azure_service.response_cache.get_stats() if self.azure_service else None,
+            'token_usage': self.azure_service.token_usage.get_stats() if self.azure_service else None,
+            'async_client': (
+                self.azure_service.get_concurrency_stats()
+                if isinstance(self.azure_service, AsyncAzureOpenAIService) else None
+            ),
+            'hedging': self._get_hedge_stats(),
+            'routing': self._get_route_stats()
+        }
+
+    def _get_route_stats(self) -> Dict:
+        """Get how many messages took each processing path"""
+        with self._stats_lock:
+            total = sum(self._route_stats.values())
+            return {
+                'fast_path_confidence': self.fast_path_confidence,
+                'fast_path_min_preferences': self.fast_path_min_preferences,
+                'total': total,
+                'counts': dict(self._route_stats),
+                'fractions': {
+                    path: round(count / total, 4) if total else 0.0
+                    for path, count in self._route_stats.items()
+                }
+            }
+
+    def _count_route(self, path: str):
+        with self._stats_lock:
+            self._route_stats[path] += 1
+        metrics.inc('chat_route_total', path=path)
+
+    def _get_hedge_stats(self) -> Dict:
+        """Get hedged-mode counters"""
+        with self._stats_lock:
+            return {
+                'enabled': self._hedging_enabled(),
+                'latency_budget': self.latency_budget,
+                **self._hedge_stats
+            }
+
+    def _count_hedge(self, key: str):
+        with self._stats_lock:
+            self._hedge_stats[key] += 1
+
     def process_message(
         self,
         message: str,
         conversation_history: List[Dict],
-        current_preferences: Dict
+        current_preferences: Dict,
+        use_cache: bool = True,
+        on_late_result: Optional[Callable[[Dict], None]] = None,
+        deadline: Optional[float] = None
     ) -> Dict:
         """
         Process user message with Azure OpenAI or fallback to keyword-based
 
+        In hedged mode (LLM_LATENCY_BUDGET > 0) the keyword answer is returned
+        when Azure misses the budget; a late Azure answer is then passed to
+        on_late_result.
+
         Args:
             message: User's input message
             conversation_history: Previous messages [{"role": "user|assistant", "content": "..."}]
             current_preferences: Current extracted preferences
+            use_cache: Set False to bypass the Azure response cache
+            on_late_result: Called with an Azure result that arrived after the budget
+            deadline: time.monotonic() value by which Azure must have answered
 
         Returns:
             Dict with bot_message, preferences, ready_for_recommendations, confidence
         """
-        # Try Azure OpenAI first if enabled
         if self.use_azure and self.azure_service:
+            # Clear, well-specified messages don't need the LLM
+            fast = self._fast_path(message, current_preferences)
+            if fast is not None:
+                return fast
+
+            # Cache hits don't call Azure, so they must not take the breaker's trial slot
+            cached = self.azure_service.get_cached(message, conversation_history, current_preferences) if use_cache else None
+            if cached is not None:
+                self._count_route('azure')
+                return cached
+
+        # Try Azure OpenAI first if enabled and the circuit allows it
+        if self.use_azure and self.azure_service and self.breaker.allow_request():
+            if self._hedging_enabled():
+                return self._hedged_process(
+                    message, conversation_history, current_preferences, use_cache, on_late_result, deadline
+                )
+
             try:
                 result = self.azure_service.chat(
                     user_message=message,
                     conversation_history=conversation_history,
-                    current_preferences=current_preferences
+                    current_preferences=current_preferences,
+                    use_cache=use_cache,
+                    deadline=deadline
                 )
 
                 # If successful and no error flag, return result
-                if not result.get("error", False):
+                if self._record_azure_result(result):
+                    self._count_route('azure')
                     return result
 
             except Exception as e:
+                self.breaker.record_failure()
                 print(f"Azure OpenAI processing failed: {e}, using fallback")
 
         # Fallback to keyword-based NLP
+        self._count_route('keyword_fallback')
         return self._fallback_process(message, current_preferences)
 
-    def _fallback_process(self, message: str, current_preferences: Dict) -> Dict:
+    def _fast_path(self, message: str, current_preferences: Dict) -> Optional[Dict]:
+        """
+        Answer from the keyword parser when it is confident enough
+
+        Args:
+            message: User's input message
+            current_preferences: Current extracted preferences
+
+        Returns:
+            Keyword result, or None if the message should go to Azure
+        """
+        if self.fast_path_confidence <= 0:
+            return None
+
+        parsed = self.fallback_nlp.parse_message(message)
+        # famous_people alone says little about what the user wants
+        structured = [key for key in parsed['preferences'] if key != 'famous_people']
+        if parsed['confidence'] < self.fast_path_confidence or len(structured) < self.fast_path_min_preferences:
+            return None
+
+        self._count_route('keyword_fast_path')
+        return self._fallback_process(message, current_preferences, parsed=parsed)
+
+    def _hedging_enabled(self) -> bool:
+        return self._hedge_executor is not None or (
+            self.latency_budget > 0 and isinstance(self.azure_service, AsyncAzureOpenAIService)
+        )
+
+    def _record_azure_result(self, result: Dict) -> bool:
+        """Feed an Azure result into the circuit breaker, returning True if it is usable"""
+        if not result.get("error", False):
+            # Cache hits say nothing about Azure's health; free a half-open trial
+            if result.get("cached", False):
+                self.breaker.release_trial()
+            else:
+                self.breaker.record_success()
+            return True
+
+        self.breaker.record_failure()
+        return False
+
+    def _hedged_process(
+        self,
+        message: str,
+        conversation_history: List[Dict],
+        current_preferences: Dict,
+        use_cache: bool,
+        on_late_result: Optional[Callable[[Dict], None]],
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """Run Azure under the latency budget with the keyword parser as backstop"""
+        started = time.monotonic()
+        self._count_hedge('requests')
+        if isinstance(self.azure_service, AsyncAzureOpenAIService):
+            future = self.azure_service.submit_chat(
+                message, conversation_history, current_preferences, use_cache, deadline
+            )
+        else:
+            future = self._hedge_executor.submit(
+                self.azure_service.chat,
+                user_message=message,
+                conversation_history=list(conversation_history),
+                current_preferences=dict(current_preferences),
+                use_cache=use_cache,
+                deadline=deadline
+            )
+
+        # Compute the keyword answer while Azure works
+        fallback = self._fallback_process(message, current_preferences)
+
+        try:
+            result = future.result(timeout=max(0.0, self.latency_budget - (time.monotonic() - started)))
+            # Coalesced callers and the response cache share the future's result
+            result = copy.deepcopy(result)
+        except FutureTimeoutError:
+            self._count_hedge('budget_exceeded')
+            self._count_route('keyword_fallback')
+            future.add_done_callback(lambda f: self._finish_late(f, on_late_result))
+            return fallback
+        except Exception as e:
+            self.breaker.record_failure()
+            print(f"Azure OpenAI processing failed: {e}, using fallback")
+            self._count_route('keyword_fallback')
+            return fallback
+
+        if self._record_azure_result(result):
+            self._count_hedge('within_budget')
+            self._count_route('azure')
+            return result
+        self._count_route('keyword_fallback')
+        return fallback
+
+    def _finish_late(self, future, on_late_result: Optional[Callable[[Dict], None]]):
+        """Settle an Azure call that finished after the latency budget"""
+        try:
+            result = copy.deepcopy(future.result())
+        except Exception as e:
+            self.breaker.record_failure()
+            print(f"Late Azure OpenAI call failed: {e}")
+            return
+
+        if not self._record_azure_result(result):
+            return
+
+        self._count_hedge('late_results')
+        if on_late_result:
+            try:
+                on_late_result(result)
+            except Exception as e:
+                print(f"Late Azure result handler failed: {e}")
+
+    def stream_message(
+        self,
+        message: str,
+        conversation_history: List[Dict],
+        current_preferences: Dict,
+        use_cache: bool = True,
+        on_late_result: Optional[Callable[[Dict], None]] = None,
+        deadline: Optional[float] = None
+    ) -> Iterator[Dict]:
+        """
+        Stream a reply, yielding bot_message deltas then the final result
+
+        Yields {"type": "delta", "text": ...} events while Azure generates, then
+        one {"type": "result", "result": {...}} event. The final result is
+        authoritative: after a mid-stream failure it carries the fallback reply.
+
+        In hedged mode the keyword answer is the result when Azure's first token
+        misses the latency budget; the late Azure answer goes to on_late_result.
+
+        Args:
+            message: User's input message
+            conversation_history: Previous messages [{"role": "user|assistant", "content": "..."}]
+            current_preferences: Current extracted preferences
+            use_cache: Set False to bypass the Azure response cache
+            on_late_result: Called with an Azure result that arrived after the budget
+            deadline: time.monotonic() value by which Azure must have answered
+        """
+        if self.use_azure and self.azure_service:
+            fast = self._fast_path(message, current_preferences)
+            if fast is not None:
+                yield {"type": "result", "result": fast}
+                return
+
+            cached = self.azure_service.get_cached(message, conversation_history, current_preferences) if use_cache else None
+            if cached is not None:
+                self._count_route('azure')
+                yield {"type": "delta", "text": cached["bot_message"]}
+                yield {"type": "result", "result": cached}
+                return
+
+        if self.use_azure and self.azure_service and self.breaker.allow_request():
+            if self._hedging_enabled():
+                yield from self._hedged_stream(
+                    message, conversation_history, current_preferences, use_cache, on_late_result, deadline
+                )
+                return
+
+            settled = False
+            events = self.azure_service.chat_stream(
+                user_message=message,
+                conversation_history=conversation_history,
+                current_preferences=current_preferences,
+                use_cache=use_cache,
+                deadline=deadline
+            )
+            try:
+                result = None
+                for event in events:
+                    if event["type"] == "delta":
+                        yield event
+                    else:
+                        result = event["result"]
+
+                settled = True
+                if result is not None and not result.get("error", False):
+                    if result.get("cached", False):
+                        self.breaker.release_trial()
+                    else:
+                        self.breaker.record_success()
+                    self._count_route('azure')
+                    yield {"type": "result", "result": result}
+                    return
+
+                self.breaker.record_failure()
+
+            except Exception as e:
+                settled = True
+                self.breaker.record_failure()
+                print(f"Azure OpenAI streaming failed: {e}, using fallback")
+
+            finally:
+                # The client disconnected before Azure finished; stop reading its stream
+                events.close()
+                if not settled:
+                    self.breaker.release_trial()
+
+        # Fallback to keyword-based NLP
+        self._count_route('keyword_fallback')
+        yield {"type": "result", "result": self._fallback_process(message, current_preferences)}
+
+    def _hedged_stream(
+        self,
+        message: str,
+        conversation_history: List[Dict],
+        current_preferences: Dict,
+        use_cache: bool,
+        on_late_result: Optional[Callable[[Dict], None]],
+        deadline: Optional[float] = None
+    ) -> Iterator[Dict]:
+        """Stream Azure if its first token beats the latency budget, else answer with the keyword parser"""
+        started = time.monotonic()
+        self._count_hedge('requests')
+        events = queue.Queue()
+        future = Future()
+        forwarding = threading.Event()
+        forwarding.set()
+        cancelled = threading.Event()
+
+        # chat_stream blocks on the network, so it is read on its own thread
+        threading.Thread(
+            target=self._pump_stream,
+            args=(message, list(conversation_history), dict(current_preferences), use_cache, deadline,
+                  events, future, forwarding, cancelled),
+            name='azure-hedge-stream',
+            daemon=True
+        ).start()
+
+        # Compute the keyword answer while Azure works
+        fallback = self._fallback_process(message, current_preferences)
+
+        try:
+            event = events.get(timeout=max(0.0, self.latency_budget - (time.monotonic() - started)))
+        except queue.Empty:
+            forwarding.clear()
+            self._count_hedge('budget_exceeded')
+            self._count_route('keyword_fallback')
+            future.add_done_callback(lambda f: self._finish_late(f, on_late_result))
+            yield {"type": "result", "result": fallback}
+            return
+
+        settled = False
+        try:
+            while event["type"] == "delta":
+                yield event
+                event = events.get()
+            settled = True
+        finally:
+            # The client disconnected before Azure finished; stop reading its stream
+            if not settled:
+                cancelled.set()
+                self.breaker.release_trial()
+
+        if event["type"] == "error":
+            self.breaker.record_failure()
+            print(f"Azure OpenAI streaming failed: {event['error']}, using fallback")
+        elif self._record_azure_result(event["result"]):
+            self._count_hedge('within_budget')
+            self._count_route('azure')
+            yield event
+            return
+
+        self._count_route('keyword_fallback')
+        yield {"type": "result", "result": fallback}
+
+    def _pump_stream(
+        self,
+        message: str,
+        conversation_history: List[Dict],
+        current_preferences: Dict,
+        use_cache: bool,
+        deadline: Optional[float],
+        events: queue.Queue,
+        future: Future,
+        forwarding: threading.Event,
+        cancelled: threading.Event
+    ):
+        """Read chat_stream into events, settling future with the final result"""
+        stream = self.azure_service.chat_stream(
+            user_message=message,
+            conversation_history=conversation_history,
+            current_preferences=current_preferences,
+            use_cache=use_cache,
+            deadline=deadline
+        )
+        try:
+            for event in stream:
+                if cancelled.is_set():
+                    return
+                if event["type"] == "result":
+                    events.put(event)
+                    future.set_result(event["result"])
+                    return
+                # After a missed budget nobody reads the deltas
+                if forwarding.is_set():
+                    events.put(event)
+            raise RuntimeError("Azure stream ended without a result")
+        except Exception as e:
+            events.put({"type": "error", "error": e})
+            future.set_exception(e)
+        finally:
+            stream.close()
+
+    def _fallback_process(self, message: str, current_preferences: Dict, parsed: Optional[Dict] = None) -> Dict:
         """
         Fallback to keyword-based NLP processing
 
         Args:
             message: User's input message
             current_preferences: Current extracted preferences
+            parsed: Result of parse_message if already computed
 
         Returns:
             Dict with bot_message, preferences, ready_for_recommendations, confidence
         """
         try:
             # Parse message with keyword-based NLP
-            parsed = self.fallback_nlp.parse_message(message)
+            if parsed is None:
+                parsed = self.fallback_nlp.parse_message(message)
 
             # Generate response
             response = self.fallback_nlp.generate_response(
@@ -103,9 +642,23 @@ class AzureNLPProcessor:
 
         except Exception as e:
             print(f"Fallback NLP error: {e}")
+            metrics.inc('nlp_fallback_errors_total')
             return {
                 "bot_message": "Sorry, I didn't quite understand that. Could you tell me about your budget or seat preferences?",
                 "preferences": {},
                 "ready_for_recommendations": False,
                 "confidence": 0.0
             }
+
+
+_processor = None
+_processor_lock = threading.Lock()
+
+
+def get_nlp_processor() -> AzureNLPProcessor:
+    """Get the process-wide NLP processor, creating it on first use"""
+    global _processor
+    with _processor_lock:
+        if _processor is None:
+            _processor = AzureNLPProcessor()
+        return _processor
@@ -0,0 +1,210 @@
+"""
+Token-aware Prompt Builder for Azure OpenAI
+Keeps recent turns verbatim and folds older ones into a compact state block
+"""
+
+import json
+import math
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # Optional; token counts fall back to a character estimate
+    tiktoken = None
+
+
+COMPACT_SYSTEM_PROMPT = """You are a friendly Seat Advisor for a theater. Reply in 2-3 warm, concise sentences, extract the user's seat preferences, and ask a clarifying question when something is missing.
+
+Seats: $100-$600 per year, some with AC, view quality 0-10, locations front/middle/back, positions aisle/center, some with famous past occupants.
+
+Always respond with JSON only:
+{"bot_message": "...", "preferences": {...}, "ready_for_recommendations": false, "confidence": 0.85}
+
+Preferences (include only what the user stated or changed):
+- budget_max: number ("cheap" = 200, "expensive" = 600)
+- ac_importance: "required" | "preferred" | "optional"
+- view_importance: 0-10 ("great view" = 9-10)
+- famous_people: true only if explicitly mentioned
+- position_preference: "aisle" | "center" | null
+- location_preference: "front" | "middle" | "back" | null
+
+Refinements: "cheaper" lowers budget_max by 20-30%, "better view" raises view_importance by 2-3, "with AC" sets ac_importance to "required". Refinements always set ready_for_recommendations to true.
+
+Set ready_for_recommendations to true with a budget plus 2 other preferences, or 3 preferences not counting famous_people.
+Confidence: 0.9+ clear, 0.7-0.9 minor ambiguity, 0.5-0.7 needs clarification, below 0.5 vague."""
+
+
+class TokenCounter:
+    """Counts prompt tokens with tiktoken when installed, else estimates from length"""
+
+    # Chat format overhead per message and for priming the reply
+    TOKENS_PER_MESSAGE = 4
+    TOKENS_PER_REPLY = 3
+
+    def __init__(self, encoding_name: str = 'o200k_base'):
+        """
+        Initialize token counter
+
+        Args:
+            encoding_name: tiktoken encoding used by the deployment's model
+        """
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                print(f"⚠️ tiktoken encoding {encoding_name} unavailable: {e}, estimating tokens")
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        """Count tokens in a piece of text"""
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return math.ceil(len(text) / 4)
+
+    def count_message(self, message: Dict) -> int:
+        """Count tokens for one chat message including format overhead"""
+        return self.TOKENS_PER_MESSAGE + self.count(message.get('content', ''))
+
+    def count_messages(self, messages: List[Dict]) -> int:
+        """Count tokens for a full chat request"""
+        return sum(self.count_message(m) for m in messages) + self.TOKENS_PER_REPLY
+
+
+class PromptBuilder:
+    """Builds chat messages that fit a per-request token budget"""
+
+    def __init__(
+        self,
+        full_system_prompt: str,
+        variant: str = 'full',
+        token_budget: int = 3000,
+        max_history_messages: int = 10,
+        counter: Optional[TokenCounter] = None
+    ):
+        """
+        Initialize prompt builder
+
+        Args:
+            full_system_prompt: Detailed system prompt with examples
+            variant: 'full' or 'compact' system prompt
+            token_budget: Maximum prompt tokens per request
+            max_history_messages: Most recent messages sent verbatim at most
+            counter: Token counter (default: new TokenCounter)
+        """
+        self.variant = variant if variant in ('full', 'compact') else 'full'
+        self.system_prompt = COMPACT_SYSTEM_PROMPT if self.variant == 'compact' else full_system_prompt
+        self.token_budget = token_budget
+        self.max_history_messages = max_history_messages
+        self.counter = counter or TokenCounter()
+        self._system_tokens = self.counter.count_message({'content': self.system_prompt})
+
+    def build(
+        self,
+        user_message: str,
+        conversation_history: List[Dict],
+        current_preferences: Dict
+    ) -> Tuple[List[Dict], Dict]:
+        """
+        Build messages for one turn
+
+        Recent history is kept newest-first while it fits the budget; older
+        turns are replaced by a state block derived from the preferences.
+
+        Args:
+            user_message: User's input message
+            conversation_history: Previous messages [{"role": "user|assistant", "content": "..."}]
+            current_preferences: Current extracted preferences
+
+        Returns:
+            Tuple of (messages, usage) where usage describes the prompt's token cost
+        """
+        recent = conversation_history[-self.max_history_messages:] if self.max_history_messages > 0 else []
+        omitted = len(conversation_history) - len(recent)
+
+        # Fit as much recent history as the budget allows, newest first
+        history_tokens = [self.counter.count_message(m) for m in recent]
+        kept = len(recent)
+        while kept > 0:
+            user_turn = self._user_turn(user_message, current_preferences, omitted + len(recent) - kept)
+            total = self._system_tokens + sum(history_tokens[len(recent) - kept:]) \
+                + self.counter.count_message(user_turn) + TokenCounter.TOKENS_PER_REPLY
+            if total <= self.token_budget:
+                break
+            kept -= 1
+
+        compacted = omitted + len(recent) - kept
+        user_turn = self._user_turn(user_message, current_preferences, compacted)
+
+        messages = [{"role": "system", "content": self.system_prompt}]
+        messages.extend(recent[len(recent) - kept:])
+        messages.append(user_turn)
+
+        prompt_tokens = self.counter.count_messages(messages)
+        usage = {
+            'variant': self.variant,
+            'estimated_prompt_tokens': prompt_tokens,
+            'token_budget': self.token_budget,
+            'over_budget': prompt_tokens > self.token_budget,
+            'history_messages_kept': kept,
+            'history_messages_compacted': compacted,
+            'exact_count': self.counter.exact
+        }
+        return messages, usage
+
+    def _user_turn(self, user_message: str, current_preferences: Dict, compacted: int) -> Dict:
+        """Build the user message with the compact state-so-far block"""
+        return {
+            "role": "user",
+            "content": user_message + "\n\n" + self.state_block(current_preferences, compacted)
+        }
+
+    @staticmethod
+    def state_block(current_preferences: Dict, compacted: int = 0) -> str:
+        """Summarize the conversation state from the extracted preferences"""
+        known = {k: v for k, v in current_preferences.items() if v is not None}
+        block = f"[Current user preferences: {json.dumps(known, separators=(',', ':'), sort_keys=True)}"
+        if compacted:
+            block += f"; {compacted} earlier messages summarized by these preferences"
+        return block + "]"
+
+
+class TokenUsageTracker:
+    """Records per-turn prompt and completion token usage"""
+
+    def __init__(self, max_turns: int = 200):
+        """
+        Initialize usage tracker
+
+        Args:
+            max_turns: Number of recent turns kept for inspection
+        """
+        self._lock = threading.Lock()
+        self._turns = deque(maxlen=max_turns)
+        self._totals = {'turns': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'compacted_turns': 0}
+
+    def record(self, usage: Dict):
+        """Record one turn's usage dict"""
+        with self._lock:
+            self._turns.append(usage)
+            self._totals['turns'] += 1
+            self._totals['prompt_tokens'] += usage.get('prompt_tokens') or usage.get('estimated_prompt_tokens', 0)
+            self._totals['completion_tokens'] += usage.get('completion_tokens') or 0
+            if usage.get('history_messages_compacted'):
+                self._totals['compacted_turns'] += 1
+
+    def get_stats(self, recent: int = 5) -> Dict:
+        """Get totals, averages and the most recent turns"""
+        with self._lock:
+            turns = self._totals['turns']
+            return {
+                **self._totals,
+                'avg_prompt_tokens': round(self._totals['prompt_tokens'] / turns, 1) if turns else 0.0,
+                'avg_completion_tokens': round(self._totals['completion_tokens'] / turns, 1) if turns else 0.0,
+                'recent': list(self._turns)[-recent:]
+            }
@@ -0,0 +1,345 @@
+"""
+Seat Feature Store
+Precomputed per-seat recommendation features, built once per inventory
+version and kept current with booking deltas
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # Optional; without it there are no columnar arrays
+    np = None
+
+
+# Upper price bound of each tier; seats above the last bound are 'premium'
+PRICE_TIERS = (('budget', 200), ('standard', 400))
+
+LOCATIONS = ('front', 'middle', 'back')
+
+
+def get_price_tier(price):
+    """Name the price tier a seat price falls in"""
+    for tier, upper in PRICE_TIERS:
+        if price <= upper:
+            return tier
+    return 'premium'
+
+
+def get_location_points(seat_type, layer):
+    """Points a seat earns for each location preference (see score_seat)"""
+    if seat_type == 'perpendicular_front':
+        front = 15
+    elif seat_type == 'regular_top' and layer <= 3:
+        front = 12
+    else:
+        front = 5
+
+    if seat_type == 'regular_top' and layer >= 3:
+        middle = 15
+    elif seat_type == 'perpendicular_front' and layer >= 8:
+        middle = 12
+    else:
+        middle = 8
+
+    if seat_type == 'regular_bottom' and layer >= 13:
+        back = 15
+    elif seat_type == 'regular_bottom':
+        back = 12
+    else:
+        back = 5
+
+    return {'front': front, 'middle': middle, 'back': back}
+
+
+def compute_seat_features(seat):
+    """
+    Derive the static scoring features of one seat
+
+    Args:
+        seat: Seat dictionary
+
+    Returns:
+        dict: pros/cons counts and score, aisle/center flags, location points
+              and price tier
+    """
+    pros_count = len(seat['pros'].split(';')) if seat.get('pros') else 0
+    cons_count = len(seat['cons'].split(';')) if seat.get('cons') else 0
+    return {
+        'pros_count': pros_count,
+        'cons_count': cons_count,
+        'pros_cons_score': min(10, pros_count * 2) - cons_count * 2,
+        'is_aisle': seat['position'] in [1, 10],
+        'is_center': 4 <= seat['position'] <= 7,
+        'location_points': get_location_points(seat['seat_type'], seat['layer']),
+        'price_tier': get_price_tier(seat['price'])
+    }
+
+
+def build_columns(seats, features):
+    """
+    Build the columnar arrays used by the vectorized scorer
+
+    Returns:
+        dict of numpy arrays aligned with seats, or None without numpy
+    """
+    if np is None:
+        return None
+    return {
+        'price': np.array([s['price'] for s in seats], dtype=np.float64),
+        'has_ac': np.array([bool(s['has_ac']) for s in seats], dtype=bool),
+        'view_quality': np.array([s['view_quality'] for s in seats], dtype=np.float64),
+        'famous': np.array([bool(s['famous_occupant']) for s in seats], dtype=bool),
+        'aisle': np.array([f['is_aisle'] for f in features], dtype=bool),
+        'center': np.array([f['is_center'] for f in features], dtype=bool),
+        'pros_cons': np.array([f['pros_cons_score'] for f in features], dtype=np.int64),
+        **{
+            f'location_{location}': np.array([f['location_points'][location] for f in features], dtype=np.int64)
+            for location in LOCATIONS
+        }
+    }
+
+
+def build_rows(seats):
+    """
+    Group seats into rows of physically adjacent seats
+
+    Args:
+        seats: Seat dictionaries
+
+    Returns:
+        list: One list of seat indices per (layer, side) row, ordered by position
+    """
+    rows = {}
+    for i, seat in enumerate(seats):
+        rows.setdefault((seat['layer'], seat['side']), []).append(i)
+    return [sorted(row, key=lambda i: seats[i]['position']) for row in rows.values()]
+
+
+class ScoreMemo:
+    """LRU of full-inventory score vectors keyed by canonical preferences
+
+    Scores depend only on static seat attributes, so a memo is shared by every
+    snapshot derived from the same build and survives availability changes.
+    """
+
+    def __init__(self, max_entries=0):
+        """
+        Initialize score memo
+
+        Args:
+            max_entries: Number of score vectors kept; 0 disables the memo
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key):
+        """Get a memoized score vector, or None"""
+        with self._lock:
+            scores = self._entries.get(key)
+            if scores is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return scores
+
+    def put(self, key, scores):
+        """Store a score vector, evicting the least recently used over the cap"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = scores
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def get_stats(self):
+        with self._lock:
+            return {**self._stats, 'entries': len(self._entries), 'max_entries': self.max_entries}
+
+
+class SeatFeatureSnapshot:
+    """Immutable view of the inventory with its precomputed features
+
+    Availability changes produce a new snapshot that shares the features and
+    columnar arrays of the old one, so readers never see a half-applied update.
+    """
+
+    def __init__(self, seats, features, columns, version, score_memo=None, rows=None):
+        """
+        Initialize snapshot
+
+        Args:
+            seats: All seat dictionaries, in inventory order
+            features: Feature dicts aligned with seats
+            columns: Columnar arrays from build_columns (or None)
+            version: Inventory revision this snapshot reflects
+            score_memo: ScoreMemo shared with snapshots of the same build
+            rows: Rows from build_rows (computed when not given)
+        """
+        self.seats = seats
+        self.features = features
+        self.columns = columns
+        self.version = version
+        self.score_memo = score_memo or ScoreMemo()
+        self.rows = rows if rows is not None else build_rows(seats)
+        self.index = {seat['id']: i for i, seat in enumerate(seats)}
+        self.available_indices = [i for i, seat in enumerate(seats) if seat['is_available'] == 1]
+        self.available_seats = [seats[i] for i in self.available_indices]
+        self.available_mask = None
+        if columns is not None:
+            self.available_mask = np.zeros(len(seats), dtype=bool)
+            self.available_mask[self.available_indices] = True
+
+    @classmethod
+    def build(cls, seats, version=0, score_memo_entries=0):
+        """Compute features for every seat"""
+        features = [compute_seat_features(seat) for seat in seats]
+        return cls(seats, features, build_columns(seats, features), version, ScoreMemo(score_memo_entries))
+
+    def get_features(self, seat_id):
+        """Get a seat's features, or None if the seat is not in this snapshot"""
+        i = self.index.get(seat_id)
+        return self.features[i] if i is not None else None
+
+    def with_changes(self, changes, version):
+        """
+        Apply availability changes
+
+        Args:
+            changes: Rows from Database.get_seat_changes (id, is_available,
+                     user_name, user_email)
+            version: Inventory revision after the changes
+
+        Returns:
+            New SeatFeatureSnapshot, or None if a change names an unknown seat
+        """
+        seats = list(self.seats)
+        for change in changes:
+            i = self.index.get(change['id'])
+            if i is None:
+                return None
+            # Replace rather than mutate; older snapshots may still be in use
+            seats[i] = dict(
+                seats[i],
+                is_available=change['is_available'],
+                user_name=change['user_name'],
+                user_email=change['user_email']
+            )
+        return SeatFeatureSnapshot(seats, self.features, self.columns, version, self.score_memo, self.rows)
+
+
+class SeatFeatureStore:
+    """Process-wide feature snapshot kept in step with the inventory revision"""
+
+    def __init__(self, db, ttl_seconds=0, score_memo_entries=64):
+        """
+        Initialize feature store
+
+        Args:
+            db: Database to read seats and availability changes from
+            ttl_seconds: Rebuild from scratch after this many seconds to pick
+                         up seat attribute edits (e.g. migrate_seats.py); 0 disables
+            score_memo_entries: Score vectors kept per build for paging
+        """
+        self.db = db
+        self.ttl_seconds = ttl_seconds
+        self.score_memo_entries = score_memo_entries
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._built_at = 0.0
+        self._stats = {'hits': 0, 'builds': 0, 'incremental_updates': 0, 'seats_updated': 0}
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """
+        Register a callback for snapshot changes
+
+        Args:
+            callback: Called as callback(previous, snapshot, changes) after a
+                      new snapshot is installed; previous and changes are None
+                      when the snapshot was rebuilt from scratch
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, previous, snapshot, changes):
+        for callback in self._listeners:
+            try:
+                callback(previous, snapshot, changes)
+            except Exception as e:
+                print(f"⚠️ Feature store listener failed: {e}")
+
+    def get_snapshot(self):
+        """Get a snapshot current with the database's inventory revision"""
+        revision = self.db.get_inventory_revision()
+
+        with self._lock:
+            snapshot = self._snapshot
+            expired = self.ttl_seconds and time.monotonic() - self._built_at > self.ttl_seconds
+            if snapshot is not None and expired:
+                snapshot = None
+            if snapshot is not None and snapshot.version == revision:
+                self._stats['hits'] += 1
+                return snapshot
+
+        if snapshot is not None:
+            delta = self.db.get_seat_changes(snapshot.version)
+            updated = None
+            if not delta['full_resync']:
+                updated = snapshot.with_changes(delta['changes'], delta['revision'])
+            if updated is not None:
+                self._install(updated, rebuilt=False, changed=len(delta['changes']))
+                self._notify(snapshot, updated, delta['changes'])
+                return updated
+
+        # Stamp with the revision read before the seats; any write in between
+        # is re-applied as a delta on the next call, which is idempotent
+        rebuilt = SeatFeatureSnapshot.build(
+            self.db.get_all_seats(), version=revision, score_memo_entries=self.score_memo_entries
+        )
+        self._install(rebuilt, rebuilt=True)
+        self._notify(None, rebuilt, None)
+        return rebuilt
+
+    def _install(self, snapshot, rebuilt, changed=0):
+        with self._lock:
+            current = self._snapshot
+            # Never replace a newer snapshot installed by a concurrent caller
+            if current is None or snapshot.version >= current.version:
+                self._snapshot = snapshot
+            if rebuilt:
+                self._built_at = time.monotonic()
+                self._stats['builds'] += 1
+            else:
+                self._stats['incremental_updates'] += 1
+                self._stats['seats_updated'] += changed
+
+    def invalidate(self):
+        """Drop the snapshot so the next call rebuilds it"""
+        with self._lock:
+            self._snapshot = None
+
+    def get_stats(self):
+        """
+        Get feature store statistics
+
+        Returns:
+            dict: Current version, size and build/update counters
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            return {
+                'version': snapshot.version if snapshot else None,
+                'seats': len(snapshot.seats) if snapshot else 0,
+                'available_seats': len(snapshot.available_seats) if snapshot else 0,
+                'vectorized': bool(snapshot and snapshot.columns is not None),
+                'score_memo': snapshot.score_memo.get_stats() if snapshot else None,
+                'ttl_seconds': self.ttl_seconds,
+                **self._stats
+            }
@@ -3,20 +3,403 @@ AI Seat Recommendation Engine
 Provides intelligent seat recommendations based on user preferences
 """
 
+import base64
+import heapq
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from seat_features import LOCATIONS, SeatFeatureSnapshot, compute_seat_features, np
+
+# Explanation for location matches, by (preference, points awarded)
+LOCATION_NOTES = {
+    ('front', 15): "✓ Premium front location (perfect match)",
+    ('front', 12): "✓ Front section",
+    ('middle', 15): "✓ Middle section",
+    ('middle', 12): "✓ Middle-front section",
+    ('back', 15): "✓ Back section (as requested)",
+    ('back', 12): "✓ Back area",
+}
+
+
+class VectorizedScorer:
+    """Scores all seats for a preference set in one batched NumPy pass
+
+    Mirrors SeatRecommender.score_seat exactly, including its integer
+    truncation, so both engines rank seats identically.
+    """
+
+    def __init__(self, columns):
+        """
+        Initialize scorer
+
+        Args:
+            columns: Columnar seat arrays from seat_features.build_columns
+        """
+        self.columns = columns
+        self.size = len(columns['price'])
+
+    def score(self, preferences):
+        """
+        Score every seat
+
+        Args:
+            preferences: Dictionary with user preferences (see score_seat)
+
+        Returns:
+            numpy int64 array of normalized 0-100 scores, one per seat
+        """
+        c = self.columns
+        max_score = 30
+        budget_min = preferences.get('budget_min', 0)
+        budget_max = preferences.get('budget_max')
+        if budget_max is None:
+            budget_max = 10000
+
+        # Budget (same operation order as score_seat so floats match)
+        over = c['price'] > budget_max
+        under = ~over & (c['price'] < budget_min)
+        # A zero denominator only happens when every seat is over or under budget
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_ratio = (budget_max - c['price']) / (budget_max - budget_min + 1)
+        score = np.where(over, -50, np.where(under, 10, np.trunc(15 + (price_ratio * 15)))).astype(np.int64)
+
+        # AC
+        ac_importance = preferences.get('ac_importance', 'optional')
+        if ac_importance == 'required':
+            max_score += 20
+            score += np.where(c['has_ac'], 20, -30)
+        elif ac_importance == 'preferred':
+            max_score += 10
+            score += np.where(c['has_ac'], 10, -5)
+        else:
+            max_score += 5
+            score += np.where(c['has_ac'], 5, 0)
+
+        # View quality
+        view_weight = int(preferences.get('view_importance', 5) * 2)
+        max_score += view_weight
+        if view_weight > 0:
+            score += np.trunc((c['view_quality'] / 10) * view_weight).astype(np.int64)
+
+        # Famous occupant
+        if preferences.get('famous_people', False):
+            max_score += 15
+            score += np.where(c['famous'], 15, 0)
+        else:
+            score += np.where(c['famous'], 3, 0)
+
+        # Position
+        position_pref = preferences.get('position_preference')
+        if position_pref:
+            max_score += 10
+            if position_pref == 'aisle':
+                score += np.where(c['aisle'], 10, 3)
+            elif position_pref == 'center':
+                score += np.where(c['center'], 10, 3)
+            elif position_pref == 'window':
+                score += 5
+            else:
+                score += 3
+
+        # Location
+        location_pref = preferences.get('location_preference')
+        if location_pref:
+            max_score += 15
+            if location_pref in LOCATIONS:
+                score += c[f'location_{location_pref}']
+
+        # Pros/cons
+        max_score += 10
+        score += c['pros_cons']
+
+        if max_score > 0:
+            normalized = np.trunc((score / max_score) * 100).astype(np.int64)
+        else:
+            normalized = np.full(self.size, 50, dtype=np.int64)
+        return np.clip(normalized, 0, 100)
+
+    def top_k(self, preferences, k, mask=None):
+        """
+        Get the k best seats, ties kept in seat order like a stable sort
+
+        Args:
+            preferences: Dictionary with user preferences
+            k: Number of seats to return
+            mask: Optional boolean array selecting the seats to rank
+
+        Returns:
+            Tuple of (seat indices, scores), best first
+        """
+        return self.select(self.score(preferences), k, mask)
+
+    def select(self, scores, k, mask=None):
+        """Get the k best seats from precomputed scores (see top_k)"""
+        candidates = np.flatnonzero(mask) if mask is not None else np.arange(self.size)
+        n = len(candidates)
+        k = max(0, min(k, n))
+        if k == 0:
+            return candidates[:0], scores[:0]
+
+        if k < n:
+            # Everything scoring at least the k-th best is a candidate
+            candidate_scores = scores[candidates]
+            kth_best = np.partition(candidate_scores, n - k)[n - k]
+            candidates = candidates[candidate_scores >= kth_best]
+
+        order = candidates[np.argsort(-scores[candidates], kind='stable')][:k]
+        return order, scores[order]
+
+
+def _skip_note(text):
+    """Explanation sink for score-only passes"""
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a recommendations cursor that cannot be decoded"""
+
+
+def canonical_preferences(preferences):
+    """
+    Reduce a preference dict to the values that change scores or wording
+
+    Preferences that score identically map to the same dict, e.g. view
+    importance 4.6 and 4.9 (both weigh 9 points) or any truthy famous_people.
+
+    Args:
+        preferences: Dictionary with user preferences
+
+    Returns:
+        dict: Canonical preferences, usable as a cache key
+    """
+    ac_importance = preferences.get('ac_importance', 'optional')
+    position = preferences.get('position_preference')
+    location = preferences.get('location_preference')
+    return {
+        'budget_max': preferences.get('budget_max'),
+        'budget_min': preferences.get('budget_min', 0),
+        'ac_importance': ac_importance if ac_importance in ('required', 'preferred') else 'optional',
+        'view_weight': int(preferences.get('view_importance', 5) * 2),
+        'famous_people': bool(preferences.get('famous_people', False)),
+        'position_preference': (position if position in ('aisle', 'center', 'window') else 'other') if position else None,
+        'location_preference': (location if location in LOCATIONS else 'other') if location else None
+    }
+
+
+def preference_key(preferences):
+    """Serialize canonical preferences into a stable key"""
+    return json.dumps(canonical_preferences(preferences), sort_keys=True, default=str)
+
+
+class RecommendationCache:
+    """LRU cache of recommendation results keyed by canonical preferences and limit
+
+    Entries are stamped with the inventory revision they were computed at.
+    When bookings or cancellations move the inventory forward, each entry is
+    checked against the changed seats and carried over only if its result
+    cannot have changed: none of its seats were booked, and no freed seat
+    would now rank inside it.
+    """
+
+    def __init__(self, max_entries=512, max_bytes=2 * 1024 * 1024):
+        """
+        Initialize recommendation cache
+
+        Args:
+            max_entries: Maximum number of cached results; 0 disables the cache
+            max_bytes: Approximate memory cap for cached results
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0, 'carried_over': 0}
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(preferences, limit):
+        """Build a cache key from the canonical preferences and limit"""
+        return f"{preference_key(preferences)}|{limit}"
+
+    def get(self, key, version):
+        """Get a cached result computed at this inventory version, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['version'] != version:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry['result']
+
+    def put(self, key, version, preferences, limit, result, last_index):
+        """
+        Store a result, evicting least recently used entries over the caps
+
+        Args:
+            key: Key from make_key
+            version: Inventory version the result was computed at
+            preferences: Preferences the result was computed for
+            limit: Requested number of recommendations
+            result: get_recommendations result
+            last_index: Snapshot index of the last recommended seat
+        """
+        size = len(key) + len(json.dumps(result, default=str))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            # Results from a snapshot older than the cache would be stale
+            if self._version is not None and version < self._version:
+                return
+            self._version = version
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {
+                'version': version,
+                'preferences': dict(preferences),
+                'limit': limit,
+                'result': dict(result),
+                'seat_ids': {r['seat']['id'] for r in result['recommendations']},
+                'last_index': last_index,
+                'size': size
+            }
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def _remove(self, key):
+        self._bytes -= self._entries.pop(key)['size']
+
+    def on_snapshot(self, previous, snapshot, changes):
+        """
+        Feature store listener: carry over or drop entries for a new snapshot
+
+        Args:
+            previous: Snapshot the changes apply to (None after a rebuild)
+            snapshot: Newly installed snapshot
+            changes: Changed seat rows (None after a rebuild)
+        """
+        if previous is None:
+            with self._lock:
+                self._stats['invalidations'] += len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+                self._version = snapshot.version
+            return
+
+        booked = set()
+        freed = []
+        for change in changes:
+            i = snapshot.index[change['id']]
+            if change['is_available'] == 1:
+                freed.append(i)
+            else:
+                booked.add(change['id'])
+
+        recommender = SeatRecommender.from_snapshot(snapshot, engine='python')
+
+        with self._lock:
+            if self._version is not None and snapshot.version < self._version:
+                return
+            for key in list(self._entries):
+                entry = self._entries[key]
+                if entry['version'] == previous.version and self._still_valid(entry, recommender, booked, freed):
+                    entry['version'] = snapshot.version
+                    entry['result'] = dict(entry['result'], total_available=len(snapshot.available_seats))
+                    self._stats['carried_over'] += 1
+                else:
+                    self._remove(key)
+                    self._stats['invalidations'] += 1
+            self._version = snapshot.version
+
+    @staticmethod
+    def _still_valid(entry, recommender, booked, freed):
+        """Whether an entry's result is unchanged by the booked and freed seats"""
+        if entry['seat_ids'] & booked:
+            return False
+        if not freed:
+            return True
+
+        recommendations = entry['result']['recommendations']
+        # A short result takes in every newly available seat
+        if len(recommendations) < entry['limit']:
+            return False
+
+        last_score = recommendations[-1]['score']
+        for i in freed:
+            score, _ = recommender.score_seat(recommender.all_seats[i], entry['preferences'])
+            # Ties rank in inventory order, as in the stable sort
+            if score > last_score or (score == last_score and i < entry['last_index']):
+                return False
+        return True
+
+    def clear(self):
+        """Drop every cached result"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self):
+        """Get hit-rate and memory statistics"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'hit_rate': round(self._stats['hits'] / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'version': self._version
+            }
+
+
 class SeatRecommender:
     """Recommends seats based on user preferences and seat attributes"""
 
-    def __init__(self, seats):
+    def __init__(self, seats, engine=None, snapshot=None, cache=None):
         """
         Initialize recommender with available seats
 
         Args:
             seats: List of seat dictionaries with all attributes
+            engine: 'numpy', 'python' or 'auto' (default: RECOMMENDER_ENGINE env, else 'auto')
+            snapshot: Precomputed SeatFeatureSnapshot of these seats; built
+                      here when not given
+            cache: Optional RecommendationCache shared across recommenders
         """
-        self.all_seats = seats
-        self.available_seats = [s for s in seats if s['is_available'] == 1]
-
-    def score_seat(self, seat, preferences):
+        self.snapshot = snapshot or SeatFeatureSnapshot.build(seats)
+        self.all_seats = self.snapshot.seats
+        self.available_seats = self.snapshot.available_seats
+
+        engine = engine or os.getenv('RECOMMENDER_ENGINE', 'auto')
+        if engine == 'numpy' and np is None:
+            raise ImportError("RECOMMENDER_ENGINE=numpy requires numpy")
+        use_numpy = self.snapshot.columns is not None and engine in ('numpy', 'auto')
+        self.engine = 'numpy' if use_numpy else 'python'
+        self._scorer = VectorizedScorer(self.snapshot.columns) if use_numpy else None
+        self.cache = cache if cache is not None and cache.enabled else None
+
+    @classmethod
+    def from_snapshot(cls, snapshot, engine=None, cache=None):
+        """Create a recommender over a feature store snapshot"""
+        return cls(snapshot.seats, engine=engine, snapshot=snapshot, cache=cache)
+
+    def _get_features(self, seat):
+        """Precomputed features for a seat, computed on the fly for unknown seats"""
+        features = self.snapshot.get_features(seat['id'])
+        return features if features is not None else compute_seat_features(seat)
+
+    def score_seat(self, seat, preferences, explain=True):
         """
         Score a seat based on user preferences
 
@@ -30,12 +413,14 @@ class SeatRecommender:
                 - famous_people: Boolean if interested in historical seats
                 - position_preference: 'aisle', 'center', or None
                 - location_preference: 'front', 'middle', 'back', or None
+            explain: Build the explanation; False returns an empty list
 
         Returns:
             tuple: (score, explanation_parts)
         """
         score = 0
         explanation = []
+        note = explanation.append if explain else _skip_note
         max_score = 0
 
         # Budget scoring (weight: 30 points)
@@ -50,11 +435,11 @@ class SeatRecommender:
         if seat['price'] > budget_max:
             # Over budget - heavy penalty
             score -= 50
-            explanation.append(f"⚠️ Over budget (${seat['price']} > ${budget_max})")
+            note(f"⚠️ Over budget (${seat['price']} > ${budget_max})")
         elif seat['price'] < budget_min:
             # Too cheap - might not meet quality expectations
             score += 10
-            explanation.append(f"Below preferred price range (${seat['price']} < ${budget_min})")
+            note(f"Below preferred price range (${seat['price']} < ${budget_min})")
         else:
             # Within budget - score based on value
             budget_score = 30
@@ -62,7 +447,7 @@ class SeatRecommender:
             price_ratio = (budget_max - seat['price']) / (budget_max - budget_min + 1)
             budget_score = int(15 + (price_ratio * 15))
             score += budget_score
-            explanation.append(f"✓ Within budget (${seat['price']})")
+            note(f"✓ Within budget (${seat['price']})")
 
         # AC scoring (weight: 20 points if required, 10 if preferred)
         ac_importance = preferences.get('ac_importance', 'optional')  # 'required', 'preferred', 'optional'
@@ -71,23 +456,23 @@ class SeatRecommender:
             max_score += 20
             if seat['has_ac']:
                 score += 20
-                explanation.append("✓ Has air conditioning (required)")
+                note("✓ Has air conditioning (required)")
             else:
                 score -= 30
-                explanation.append("✗ No AC (dealbreaker)")
+                note("✗ No AC (dealbreaker)")
         elif ac_importance == 'preferred':
             max_score += 10
             if seat['has_ac']:
                 score += 10
-                explanation.append("✓ Has air conditioning")
+                note("✓ Has air conditioning")
             else:
                 score -= 5
-                explanation.append("⚠️ No AC")
+                note("⚠️ No AC")
         else:  # optional
             max_score += 5
             if seat['has_ac']:
                 score += 5
-                explanation.append("✓ Has air conditioning")
+                note("✓ Has air conditioning")
 
         # View quality scoring (weight: variable based on importance)
         view_importance = preferences.get('view_importance', 5)  # 0-10
@@ -99,41 +484,42 @@ class SeatRecommender:
             score += view_score
 
             if seat['view_quality'] >= 8:
-                explanation.append(f"✓ Excellent view ({seat['view_quality']}/10)")
+                note(f"✓ Excellent view ({seat['view_quality']}/10)")
             elif seat['view_quality'] >= 6:
-                explanation.append(f"✓ Good view ({seat['view_quality']}/10)")
+                note(f"✓ Good view ({seat['view_quality']}/10)")
             else:
-                explanation.append(f"⚠️ Limited view ({seat['view_quality']}/10)")
+                note(f"⚠️ Limited view ({seat['view_quality']}/10)")
 
         # Famous occupant scoring (weight: 15 points if interested)
         if preferences.get('famous_people', False):
             max_score += 15
             if seat['famous_occupant']:
                 score += 15
-                explanation.append(f"⭐ Historical: {seat['famous_occupant']}")
+                note(f"⭐ Historical: {seat['famous_occupant']}")
             else:
-                explanation.append("No historical significance")
+                note("No historical significance")
         else:
             # Still give small bonus if famous
             if seat['famous_occupant']:
                 score += 3
-                explanation.append(f"Historical note: {seat['famous_occupant']}")
+                note(f"Historical note: {seat['famous_occupant']}")
+
+        features = self._get_features(seat)
 
         # Position preference (weight: 10 points)
         position_pref = preferences.get('position_preference')
         if position_pref:
             max_score += 10
-            position = seat['position']
 
-            if position_pref == 'aisle' and position in [1, 10]:
+            if position_pref == 'aisle' and features['is_aisle']:
                 score += 10
-                explanation.append("✓ Aisle seat (as requested)")
-            elif position_pref == 'center' and 4 <= position <= 7:
+                note("✓ Aisle seat (as requested)")
+            elif position_pref == 'center' and features['is_center']:
                 score += 10
-                explanation.append("✓ Center position (as requested)")
+                note("✓ Center position (as requested)")
             elif position_pref == 'window':  # side positions
                 score += 5
-                explanation.append("Side position")
+                note("Side position")
             else:
                 score += 3
 
@@ -141,47 +527,15 @@ class SeatRecommender:
         location_pref = preferences.get('location_preference')
         if location_pref:
             max_score += 15
-            seat_type = seat['seat_type']
-            layer = seat['layer']
-
-            if location_pref == 'front':
-                if seat_type == 'perpendicular_front':
-                    score += 15
-                    explanation.append("✓ Premium front location (perfect match)")
-                elif seat_type == 'regular_top' and layer <= 3:
-                    score += 12
-                    explanation.append("✓ Front section")
-                else:
-                    score += 5
-            elif location_pref == 'middle':
-                if seat_type == 'regular_top' and layer >= 3:
-                    score += 15
-                    explanation.append("✓ Middle section")
-                elif seat_type == 'perpendicular_front' and layer >= 8:
-                    score += 12
-                    explanation.append("✓ Middle-front section")
-                else:
-                    score += 8
-            elif location_pref == 'back':
-                if seat_type == 'regular_bottom' and layer >= 13:
-                    score += 15
-                    explanation.append("✓ Back section (as requested)")
-                elif seat_type == 'regular_bottom':
-                    score += 12
-                    explanation.append("✓ Back area")
-                else:
-                    score += 5
+            if location_pref in LOCATIONS:
+                location_score = features['location_points'][location_pref]
+                score += location_score
+                if (location_pref, location_score) in LOCATION_NOTES:
+                    note(LOCATION_NOTES[(location_pref, location_score)])
 
         # Pros/cons consideration (weight: 10 points)
         max_score += 10
-        if seat.get('pros'):
-            pros_count = len(seat['pros'].split(';'))
-            pros_score = min(10, pros_count * 2)
-            score += pros_score
-
-        if seat.get('cons'):
-            cons_count = len(seat['cons'].split(';'))
-            score -= cons_count * 2
+        score += features['pros_cons_score']
 
         # Normalize score to percentage
         if max_score > 0:
@@ -194,50 +548,284 @@ class SeatRecommender:
 
         return normalized_score, explanation
 
-    def get_recommendations(self, preferences, limit=5):
+    def score_all(self, preferences):
+        """
+        Score every seat in the inventory, booked or not
+
+        Scores are memoized on the snapshot, so paging through results or
+        repeating preferences between bookings does not rescore the venue.
+
+        Returns:
+            Scores aligned with all_seats (numpy array or list)
+        """
+        key = (self.engine, preference_key(preferences))
+        scores = self.snapshot.score_memo.get(key)
+        if scores is None:
+            if self._scorer is not None:
+                scores = self._scorer.score(preferences)
+            else:
+                scores = [self.score_seat(seat, preferences, explain=False)[0] for seat in self.all_seats]
+            self.snapshot.score_memo.put(key, scores)
+        return scores
+
+    def rank(self, preferences, limit, after=None):
+        """
+        Select the best available seats in O(n log k)
+
+        Seats are ordered by score, then inventory order, exactly like a
+        stable sort of available_seats by descending score.
+
+        Args:
+            preferences: Dictionary with user preferences
+            limit: Number of seats to select
+            after: Optional (score, seat index) cursor position; only seats
+                   ranked after it are considered
+
+        Returns:
+            Tuple of ([(seat index, score), ...] best first, number of
+            available seats ranked after the cursor)
+        """
+        scores = self.score_all(preferences)
+
+        if self._scorer is not None:
+            mask = self.snapshot.available_mask
+            if after is not None:
+                after_score, after_index = after
+                positions = np.arange(len(scores))
+                mask = mask & ((scores < after_score) | ((scores == after_score) & (positions > after_index)))
+            indices, top = self._scorer.select(scores, limit, mask)
+            return list(zip(indices.tolist(), top.tolist())), int(mask.sum())
+
+        # Min-heap of the best k so far as (score, -index); its root is the
+        # weakest selected seat
+        heap = []
+        remaining = 0
+        for i in self.snapshot.available_indices:
+            score = scores[i]
+            if after is not None and (score > after[0] or (score == after[0] and i <= after[1])):
+                continue
+            remaining += 1
+            if limit <= 0:
+                continue
+            entry = (score, -i)
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+        return [(-neg_index, score) for score, neg_index in sorted(heap, reverse=True)], remaining
+
+    @staticmethod
+    def encode_cursor(score, seat_id):
+        """Opaque cursor for the position after a recommended seat"""
+        return base64.urlsafe_b64encode(json.dumps([score, seat_id]).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """
+        Decode a cursor into a (score, seat index) position
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed or names an unknown seat
+        """
+        try:
+            score, seat_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (ValueError, TypeError, AttributeError):
+            raise InvalidCursorError('Invalid cursor')
+        if not isinstance(score, int) or not isinstance(seat_id, int) or seat_id not in self.snapshot.index:
+            raise InvalidCursorError('Invalid cursor')
+        index = self.snapshot.index[seat_id]
+        return score, index
+
+    def get_recommendations(self, preferences, limit=5, cursor=None):
         """
         Get top seat recommendations based on preferences
 
         Args:
             preferences: Dictionary with user preferences
             limit: Maximum number of recommendations to return
+            cursor: next_cursor from a previous call, to get the following page
 
         Returns:
-            List of recommended seats with scores and explanations
+            List of recommended seats with scores and explanations, plus a
+            next_cursor for the following page (None on the last page)
         """
         if not self.available_seats:
             return {
                 'recommendations': [],
                 'message': 'No available seats found',
-                'total_available': 0
+                'total_available': 0,
+                'next_cursor': None
             }
 
-        # Score all available seats
-        scored_seats = []
-        for seat in self.available_seats:
-            score, explanation = self.score_seat(seat, preferences)
-
-            scored_seats.append({
+        after = self.decode_cursor(cursor) if cursor else None
+
+        if self.cache is not None and after is None:
+            key = self.cache.make_key(preferences, limit)
+            cached = self.cache.get(key, self.snapshot.version)
+            if cached is not None:
+                recommendations = cached['recommendations']
+                return dict(
+                    cached,
+                    preferences_used=preferences,
+                    next_cursor=self._next_cursor(recommendations, cached['total_available'] - len(recommendations))
+                )
+
+        ranked, remaining = self.rank(preferences, limit, after)
+
+        # Explanations only for the seats returned
+        recommendations = []
+        for index, score in ranked:
+            seat = self.all_seats[index]
+            recommendations.append({
                 'seat': seat,
                 'score': score,
-                'explanation': explanation,
+                'explanation': self.score_seat(seat, preferences)[1],
                 'match_quality': self._get_match_quality(score)
             })
 
-        # Sort by score (highest first)
-        scored_seats.sort(key=lambda x: x['score'], reverse=True)
-
-        # Get top recommendations
-        recommendations = scored_seats[:limit]
-
         # Build response
-        return {
+        result = {
             'recommendations': recommendations,
             'total_available': len(self.available_seats),
             'preferences_used': preferences,
             'summary': self._generate_summary(recommendations, preferences)
         }
 
+        if self.cache is not None and after is None and recommendations:
+            last_index = self.snapshot.index[recommendations[-1]['seat']['id']]
+            self.cache.put(key, self.snapshot.version, preferences, limit, result, last_index)
+
+        result['next_cursor'] = self._next_cursor(recommendations, remaining - len(recommendations))
+        return result
+
+    def _next_cursor(self, recommendations, remaining):
+        """Cursor after the last recommendation, or None if nothing follows"""
+        if not recommendations or remaining <= 0:
+            return None
+        last = recommendations[-1]
+        return self.encode_cursor(last['score'], last['seat']['id'])
+
+    def find_runs(self, scores, group_size):
+        """
+        Score every run of group_size adjacent available seats
+
+        Each row is swept once with a sliding window whose score sum is
+        updated as seats enter and leave, so the work is linear in the
+        number of seats.
+
+        Args:
+            scores: Per-seat scores aligned with all_seats
+            group_size: Number of seats in a run
+
+        Returns:
+            list: (score sum, seat indices) for every run, in inventory order
+        """
+        seats = self.all_seats
+        runs = []
+        for row in self.snapshot.rows:
+            start = 0
+            window_sum = 0
+            for j, i in enumerate(row):
+                if seats[i]['is_available'] != 1:
+                    start = j + 1
+                    window_sum = 0
+                    continue
+                # A gap in positions breaks adjacency
+                if j > start and seats[i]['position'] != seats[row[j - 1]]['position'] + 1:
+                    start = j
+                    window_sum = 0
+
+                window_sum += scores[i]
+                if j - start + 1 > group_size:
+                    window_sum -= scores[row[start]]
+                    start += 1
+                if j - start + 1 == group_size:
+                    runs.append((window_sum, row[start:j + 1]))
+        return runs
+
+    def get_group_recommendations(self, preferences, group_size, limit=3):
+        """
+        Get the best groups of adjacent available seats
+
+        A group is group_size available seats in consecutive positions of one
+        layer and side, scored as the average of its seats' scores. Returned
+        groups never share seats.
+
+        Args:
+            preferences: Dictionary with user preferences
+            group_size: Number of seats that must sit together
+            limit: Maximum number of groups to return
+
+        Returns:
+            Groups with their seats, score, total price and explanation
+        """
+        if group_size < 1:
+            raise ValueError('group_size must be at least 1')
+
+        scores = self.score_all(preferences)
+        if self._scorer is not None:
+            scores = scores.tolist()
+
+        runs = self.find_runs(scores, group_size)
+
+        # Best score first, ties in inventory order; skip runs overlapping a
+        # group already picked
+        heap = [(-window_sum, members[0], members) for window_sum, members in runs]
+        heapq.heapify(heap)
+        taken = set()
+        groups = []
+        while heap and len(groups) < limit:
+            neg_sum, _, members = heapq.heappop(heap)
+            if taken.intersection(members):
+                continue
+            taken.update(members)
+            groups.append(self._describe_group(members, -neg_sum // group_size, preferences))
+
+        return {
+            'groups': groups,
+            'group_size': group_size,
+            'total_runs': len(runs),
+            'total_available': len(self.available_seats),
+            'preferences_used': preferences,
+            'summary': self._generate_group_summary(groups, group_size, preferences)
+        }
+
+    def _describe_group(self, members, score, preferences):
+        """Build a group result; explanations list what every seat shares"""
+        group_seats = [self.all_seats[i] for i in members]
+        notes = [self.score_seat(seat, preferences)[1] for seat in group_seats]
+        shared = [note for note in notes[0] if all(note in other for other in notes[1:])]
+        first, last = group_seats[0], group_seats[-1]
+        return {
+            'seats': group_seats,
+            'seat_ids': [seat['id'] for seat in group_seats],
+            'score': score,
+            'total_price': sum(seat['price'] for seat in group_seats),
+            'explanation': [f"✓ {len(group_seats)} seats together (positions {first['position']}-{last['position']})"] + shared,
+            'match_quality': self._get_match_quality(score)
+        }
+
+    def _generate_group_summary(self, groups, group_size, preferences):
+        """Generate a summary of group recommendations"""
+        if not groups:
+            return f"No {group_size} adjacent seats are available together. Try a smaller group."
+
+        best_score = groups[0]['score']
+        if best_score >= 85:
+            summary = [f"🎉 We found excellent spots for {group_size} seats together!"]
+        elif best_score >= 70:
+            summary = [f"👍 We found great spots for {group_size} seats together!"]
+        elif best_score >= 55:
+            summary = [f"✓ We found good spots for {group_size} seats together."]
+        else:
+            summary = ["⚠️ Limited options for seats together. Consider adjusting your preferences."]
+
+        if preferences.get('budget_max'):
+            within = [g for g in groups if all(s['price'] <= preferences['budget_max'] for s in g['seats'])]
+            summary.append(f"{len(within)} of {len(groups)} groups are within your budget of ${preferences['budget_max']} per seat.")
+
+        return " ".join(summary)
+
     def _get_match_quality(self, score):
         """Convert score to quality label"""
         if score >= 85:
@@ -316,4 +904,7 @@ class SeatRecommender:
         if 'seat_type' in filters:
             matches = [s for s in matches if s['seat_type'] == filters['seat_type']]
 
+        if 'price_tier' in filters:
+            matches = [s for s in matches if self._get_features(s)['price_tier'] == filters['price_tier']]
+
         return matches
@@ -33,7 +33,8 @@ class SessionManager:
             "created_at": time.time(),
             "last_active": time.time(),
             "conversation_history": [],
-            "preferences": {}
+            "preferences": {},
+            "turns": 0
         }
         return session_id
 
@@ -81,6 +82,7 @@ class SessionManager:
 
         session = self.sessions[session_id]
         session["last_active"] = time.time()
+        session["turns"] += 1
 
         # Add to conversation history
         session["conversation_history"].append({
@@ -101,6 +103,38 @@ class SessionManager:
 
         return session_id
 
+    def get_turn_count(self, session_id: str) -> int:
+        """
+        Get number of completed exchanges in a session
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            int: Exchanges so far (0 if not found)
+        """
+        session = self.sessions.get(session_id)
+        return session["turns"] if session else 0
+
+    def merge_preferences(self, session_id: str, preferences: Dict, turn: Optional[int] = None) -> bool:
+        """
+        Merge preferences into a session without adding messages
+
+        Args:
+            session_id: Session identifier
+            preferences: Preferences to merge (new values override old)
+            turn: Only merge if the session is still at this exchange count
+
+        Returns:
+            bool: True if merged, False if the session is gone or has moved on
+        """
+        session = self.sessions.get(session_id)
+        if not session or (turn is not None and session["turns"] != turn):
+            return False
+
+        session["preferences"].update(preferences)
+        return True
+
     def get_conversation_history(self, session_id: str) -> List[Dict]:
         """
         Get conversation history for a session
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import './App.css';
 import SeatMap from './components/SeatMap';
 import BookingForm from './components/BookingForm';
@@ -23,6 +23,7 @@ function App() {
   const [showSeatAdvisor, setShowSeatAdvisor] = useState(false);
   const [recommendedSeats, setRecommendedSeats] = useState([]);
   const [viewMode, setViewMode] = useState('2d'); // '2d' or '3d'
+  const inventoryRevision = useRef(null);
 
   useEffect(() => {
     fetchSeats();
@@ -36,6 +37,8 @@ function App() {
       setLoading(true);
       const response = await axios.get(`${API_URL}/seats`);
       setSeats(response.data);
+      const revision = parseInt(response.headers['x-inventory-revision'], 10);
+      inventoryRevision.current = Number.isNaN(revision) ? null : revision;
       setError(null);
     } catch (err) {
       setError('Failed to load seats. Please make sure the backend server is running.');
@@ -45,6 +48,41 @@ function App() {
     }
   };
 
+  // Apply only the seats that changed since the last known revision
+  const fetchSeatChanges = async () => {
+    if (inventoryRevision.current === null) {
+      return fetchSeats();
+    }
+
+    try {
+      const response = await axios.get(`${API_URL}/seats/changes`, {
+        params: { since: inventoryRevision.current }
+      });
+      const { revision, changes, full_resync } = response.data;
+
+      if (full_resync) {
+        return fetchSeats();
+      }
+
+      if (changes.length > 0) {
+        const changedById = new Map(changes.map(change => [change.id, change]));
+        setSeats(prevSeats => prevSeats.map(seat => {
+          const change = changedById.get(seat.id);
+          return change ? {
+            ...seat,
+            is_available: change.is_available,
+            user_name: change.user_name,
+            user_email: change.user_email
+          } : seat;
+        }));
+      }
+      inventoryRevision.current = revision;
+    } catch (err) {
+      console.error('Error fetching seat changes:', err);
+      fetchSeats();
+    }
+  };
+
   const fetchBookings = async () => {
     try {
       const response = await axios.get(`${API_URL}/bookings`);
@@ -69,13 +107,13 @@ function App() {
       setSelectedSeat(null);
 
       // Set email status from response
-      if (response.data.email_sent) {
+      if (response.data.email_status === 'queued') {
         setEmailStatus({ success: true, message: response.data.email_message });
       } else {
         setEmailStatus({ success: false, message: response.data.email_message });
       }
 
-      fetchSeats(); // Refresh seats after booking
+      fetchSeatChanges(); // Refresh only the seats that changed
 
       // Reset messages after 5 seconds
       setTimeout(() => {
@@ -61,6 +61,11 @@ function BookingForm({ seat, seats, onSubmit, onCancel }) {
 
   // Calculate seat ID (F1, M1, B94, etc.)
   const getSeatLabel = (currentSeat) => {
+    // Prefer the seat code precomputed by the backend
+    if (currentSeat.seat_code) {
+      return currentSeat.seat_code;
+    }
+
     const seatType = currentSeat.seat_type || 'regular';
 
     if (seatType === 'regular_top') {
@@ -204,7 +204,7 @@ const SeatAdvisorChat = ({ onSeatRecommend, onClose, onRecommendationsReceived }
     }
   };
 
-  const fetchRecommendations = async (prefs) => {
+  const fetchRecommendations = async (prefs, cursor = null) => {
     try {
       setAiThinkingMessage('🔍 Finding the best seats for you...');
 
@@ -220,6 +220,11 @@ const SeatAdvisorChat = ({ onSeatRecommend, onClose, onRecommendationsReceived }
         limit: 3
       };
 
+      // Continue from the previous page for "show more"
+      if (cursor) {
+        requestData.cursor = cursor;
+      }
+
       console.log('Fetching recommendations with:', requestData);
 
       const response = await axios.post(`${API_URL}/seat-recommendations`, requestData);
@@ -246,7 +251,9 @@ const SeatAdvisorChat = ({ onSeatRecommend, onClose, onRecommendationsReceived }
       if (response.data.recommendations.length > 0) {
         setTimeout(() => {
           addBotMessage(
-            `Here are my top ${response.data.recommendations.length} recommendations for you:`,
+            cursor
+              ? `Here are ${response.data.recommendations.length} more options:`
+              : `Here are my top ${response.data.recommendations.length} recommendations for you:`,
             null
           );
 
@@ -257,10 +264,12 @@ const SeatAdvisorChat = ({ onSeatRecommend, onClose, onRecommendationsReceived }
           });
 
           // Add refinement prompt with quick reply buttons
+          const nextCursor = response.data.next_cursor;
           setTimeout(() => {
             addBotMessage(
               "💬 Want to refine these results? Use quick actions below or type your request:",
               [
+                ...(nextCursor ? [{ label: '➕ Show More', value: 'more', action: () => { addUserMessage('Show me more options'); fetchRecommendations(prefs, nextCursor); } }] : []),
                 { label: '💰 Show Cheaper', value: 'cheaper', action: () => handleShowCheaper() },
                 { label: '💎 Better View', value: 'view', action: () => handleQuickRefinement('I want seats with better view') },
                 { label: '⬆️ Front Section', value: 'front', action: () => handleQuickRefinement('show me front section seats') },
@@ -587,6 +596,49 @@ ${rec.explanation.map(exp => `• ${exp}`).join('\n')}
     setTimeout(() => askBudget(), 500);
   };
 
+  // Send a chat message over Server-Sent Events; onDelta receives the reply text so far
+  const streamChat = async (message, onDelta) => {
+    const response = await fetch(`${API_URL}/chat/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ message: message, session_id: sessionId })
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Chat stream failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let text = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        const eventMatch = rawEvent.match(/^event: (.*)$/m);
+        const dataMatch = rawEvent.match(/^data: (.*)$/m);
+        if (!eventMatch || !dataMatch) continue;
+
+        const payload = JSON.parse(dataMatch[1]);
+        if (eventMatch[1] === 'delta') {
+          text += payload.text;
+          onDelta(text);
+        } else if (eventMatch[1] === 'done') {
+          return payload;
+        } else if (eventMatch[1] === 'error') {
+          throw new Error(payload.error);
+        }
+      }
+    }
+    throw new Error('Chat stream ended without a reply');
+  };
+
   const handleSendMessage = async () => {
     if (!userInput.trim()) return;
 
@@ -597,21 +649,19 @@ ${rec.explanation.map(exp => `• ${exp}`).join('\n')}
     setAiThinkingMessage('🤖 Analyzing your preferences...');
 
     try {
-      const response = await axios.post(`${API_URL}/chat`, {
-        message: message,
-        session_id: sessionId
-      });
+      // Show the reply in the typing bubble while it streams in
+      const data = await streamChat(message, (text) => setAiThinkingMessage(text));
 
       // Store session ID for future messages
-      if (response.data.session_id && !sessionId) {
-        setSessionId(response.data.session_id);
+      if (data.session_id && !sessionId) {
+        setSessionId(data.session_id);
       }
 
       // Update preferences from Azure OpenAI
-      setPreferences(response.data.preferences);
+      setPreferences(data.preferences);
 
       // Add bot response with confidence indicator
-      const confidence = response.data.confidence || 0.8;
+      const confidence = data.confidence || 0.8;
       let confidenceEmoji = '🎯';
       let confidenceText = '';
 
@@ -627,22 +677,22 @@ ${rec.explanation.map(exp => `• ${exp}`).join('\n')}
       }
 
       const messageWithConfidence = confidence < 0.9 && confidence > 0
-        ? `${response.data.response}\n\n${confidenceEmoji} ${confidenceText}`
-        : response.data.response;
+        ? `${data.response}\n\n${confidenceEmoji} ${confidenceText}`
+        : data.response;
 
       addBotMessage(messageWithConfidence);
 
       // If ready for recommendations, fetch them
-      if (response.data.ready_for_recommendations && currentStep !== 'results') {
+      if (data.ready_for_recommendations && currentStep !== 'results') {
         setCurrentStep('results');
         setTimeout(async () => {
-          await fetchRecommendations(response.data.preferences);
+          await fetchRecommendations(data.preferences);
         }, 1000);
       } else if (currentStep === 'results') {
         // User is refining results, fetch new recommendations automatically
         setTimeout(async () => {
           addBotMessage("Let me find updated recommendations for you... 🔍");
-          await fetchRecommendations(response.data.preferences);
+          await fetchRecommendations(data.preferences);
         }, 500);
       }
 
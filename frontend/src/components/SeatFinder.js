@@ -212,6 +212,11 @@ function SeatFinder({ seats, onClose, onSeatSelect }) {
   };
 
   const getSeatLabel = (seat) => {
+    // Prefer the seat code precomputed by the backend
+    if (seat.seat_code) {
+      return seat.seat_code;
+    }
+
     // Calculate seat ID based on type and position
     if (seat.seat_type === 'regular_top') {
       // Find position among all top seats